@@ -17,15 +17,29 @@ DAW-style MIDI Annotator (Tkinter)
               selected measure as the anchor; Paste goes to the current selection start or the playhead.
 - **NEW**: Undo / Redo for annotation edits (Cmd–Z / Cmd–Shift–Z). State snapshots include instructions, countdowns,
            and measure selection. Redo history clears on new edits.
+- **NEW**: Notes are queued ahead on FluidSynth's sequencer (sample-clocked) when the synth drives its own audio.
+- **NEW**: With sounddevice installed, FluidSynth renders fixed-size PCM blocks into a bounded queue drained by the
+           audio callback (set DAW_AUDIO_OUTPUT=driver to use FluidSynth's own driver instead).
 """
 
+import functools
+import json
+import logging
 import math
+import operator
 import os
+import pickle
+import queue
+import re
 import threading
 import time
+import types
 from dataclasses import dataclass, field
 from typing import Dict, List, Optional, Tuple, Union
 import copy
+import heapq
+import mmap
+from collections import OrderedDict, defaultdict, deque
 
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
@@ -33,6 +47,12 @@ from tkinter import ttk, filedialog, messagebox
 import yaml
 import mido
 import bisect
+import numpy as np
+
+log = logging.getLogger("daw")
+
+# libyaml-backed loader when PyYAML was built with it; same SafeLoader semantics
+YamlLoader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
 
 # ---- Optional FluidSynth ----
 try:
@@ -42,6 +62,22 @@ except Exception:
     fluidsynth = None
     HAS_FLUID = False
 
+# ---- Optional Pillow (piano-roll bitmap) ----
+try:
+    from PIL import Image, ImageTk
+    HAS_PIL = True
+except Exception:
+    Image = ImageTk = None
+    HAS_PIL = False
+
+# ---- Optional sounddevice (buffered PCM output) ----
+try:
+    import sounddevice
+    HAS_SOUNDDEVICE = True
+except Exception:
+    sounddevice = None
+    HAS_SOUNDDEVICE = False
+
 # ======================= Data models =======================
 @dataclass
 class Countdown:
@@ -52,33 +88,116 @@ class Countdown:
 @dataclass
 class Instruction:
     text: str
-    measure_numbers: List[int]
+    measure_numbers: List[int]  # kept sorted and unique
     instruction_duration_in_measures: int
     voiced: bool
     rhythmic: bool = False  # optional
 
-class FlowList(list):
-    """Render as [a, b, c] in YAML while keeping other lists block-style."""
-    pass
+    def __post_init__(self):
+        # coerce once here so export can extend without per-element int(); sorted so
+        # lookups/removals can bisect and the list view needs no sort
+        self.measure_numbers = sorted(set(map(int, self.measure_numbers)))
+
+# YAML field -> default; missing keys take these, matching the old per-key .get() calls
+_CD_DEFAULTS = {"start_measure": 1, "count_from": 4, "offset_in_ms": 0}
+_CD_FIELDS = operator.itemgetter(*_CD_DEFAULTS)
+_INS_DEFAULTS = {"text": "", "measure_numbers": [], "instruction_duration_in_measures": 1,
+                 "voiced": False, "rhythmic": False}
+_INS_FIELDS = operator.itemgetter(*_INS_DEFAULTS)
+
+def _countdown_from_yaml(c: dict) -> Countdown:
+    sm, cf, off = _CD_FIELDS({**_CD_DEFAULTS, **c})
+    return Countdown(start_measure=int(sm), count_from=int(cf), offset_in_ms=int(off or 0))
+
+def _instruction_from_yaml(it: dict) -> Optional[Instruction]:
+    """Instruction for one YAML entry, or None when its text is empty."""
+    text, measures, dur, voiced, rhythmic = _INS_FIELDS({**_INS_DEFAULTS, **it})
+    text = str(text).strip()
+    if not text:
+        return None
+    if not isinstance(measures, list):
+        measures = [measures]
+    # measure_numbers are int()-ed by Instruction.__post_init__
+    return Instruction(text=text, measure_numbers=measures, instruction_duration_in_measures=int(dur or 1),
+                       voiced=bool(voiced), rhythmic=bool(rhythmic))
+
+def _build_all(build, items: list) -> list:
+    """[build(x) for x in items], dropping entries that raise; the common all-valid case has one try."""
+    try:
+        return [build(x) for x in items]
+    except Exception:
+        pass
+    out = []
+    for x in items:
+        try:
+            out.append(build(x))
+        except Exception:
+            continue
+    return out
+
+# Export YAML is written directly; the schema is fixed, so a Dumper adds nothing but time.
+# Text is left plain where PyYAML would, single-quoted when it is printable ASCII, and
+# double-quoted (JSON escapes, plus the chars YAML can't hold raw) otherwise.
+_YAML_PLAIN = re.compile(r"[A-Za-z_][\w .,'!?()/&+-]*", re.ASCII)
+_YAML_RESERVED = {"yes", "no", "true", "false", "on", "off", "null"}  # would load as bool/None
+_YAML_ESCAPE = re.compile("[\x7f-\x9f\u2028\u2029\ud800-\udfff\ufffe\uffff]")
+
+def _yaml_str(s: str) -> str:
+    if _YAML_PLAIN.fullmatch(s) and s[-1] != " " and s.lower() not in _YAML_RESERVED:
+        return s
+    if s.isascii() and s.isprintable():
+        return "'" + s.replace("'", "''") + "'"
+    return _YAML_ESCAPE.sub(lambda m: "\\u%04x" % ord(m.group()), json.dumps(s, ensure_ascii=False))
+
+def _yaml_value(v) -> str:
+    if isinstance(v, bool):
+        return "true" if v else "false"
+    if isinstance(v, int):
+        return str(v)
+    if isinstance(v, list):
+        return "[" + ", ".join(map(_yaml_value, v)) + "]"  # flow style, as for measure_numbers
+    return _yaml_str(str(v))
 
 @dataclass
 class AnnoDoc:
     countdowns: List[Countdown] = field(default_factory=list)
     instructions: List[Instruction] = field(default_factory=list)
 
-    def to_yaml(self) -> str:
-        """Serialize with merged instructions; inline only measure_numbers; always include offset_in_ms."""
-        merged: Dict[Tuple[Union[str,int,bool], ...], List[int]] = {}
+    def to_yaml(self, stream=None) -> Optional[str]:
+        """Serialize with merged instructions; inline only measure_numbers; always include offset_in_ms.
+
+        Written to `stream` when given (returns None), otherwise returned as a string.
+        """
+        parts: List[str] = []
+        for section, items in self.to_plain().items():
+            if not items:
+                parts.append(f"{section}: []\n")
+                continue
+            parts.append(f"{section}:\n")
+            for item in items:
+                lead = "- "
+                for k, v in item.items():
+                    parts.append(f"{lead}{k}: {_yaml_value(v)}\n")
+                    lead = "  "
+        text = "".join(parts)
+        if stream is None:
+            return text
+        stream.write(text)
+        return None
+
+    def to_plain(self) -> Dict[str, list]:
+        """The export document as plain dicts/lists (instructions merged by properties)."""
+        merged: Dict[Tuple[Union[str,int,bool], ...], List[int]] = defaultdict(list)
         for ins in self.instructions:
             key = (ins.text, ins.instruction_duration_in_measures, ins.voiced, getattr(ins, "rhythmic", False))
-            merged.setdefault(key, []).extend(int(m) for m in ins.measure_numbers)
+            merged[key].extend(ins.measure_numbers)
 
         merged_list: List[Dict[str, object]] = []
         for (text, dur, voiced, rhythmic), measures in merged.items():
             measures_sorted = sorted(set(measures))
             item = {
                 "text": text,
-                "measure_numbers": FlowList(measures_sorted),  # flow-style only here
+                "measure_numbers": measures_sorted,  # flow-style in to_yaml
                 "instruction_duration_in_measures": int(dur),
                 "voiced": bool(voiced),
             }
@@ -94,124 +213,494 @@ class AnnoDoc:
                 "offset_in_ms": int(getattr(c, "offset_in_ms", 0)),
             })
 
-        data = {"countdowns": cds, "instructions": merged_list}
-
-        class FlowOnlyForMeasureNumbers(yaml.SafeDumper):
-            pass
-
-        def _repr_flowlist(dumper, data):
-            return dumper.represent_sequence("tag:yaml.org,2002:seq", list(data), flow_style=True)
-
-        FlowOnlyForMeasureNumbers.add_representer(FlowList, _repr_flowlist)
-
-        return yaml.dump(data, sort_keys=False, width=120, Dumper=FlowOnlyForMeasureNumbers)
+        return {"countdowns": cds, "instructions": merged_list}
 
 
 # ======================= MIDI summary =======================
-@dataclass
+EV_OFF, EV_ON = 0, 1  # MidiSummary.event_kind codes
+EV_CLICK_ON, EV_CLICK_OFF = 2, 3  # metronome kinds in playback arrays
+# one playback event; MIDI notes and metronome clicks are merged into one array of these
+PLAY_EVENT_DTYPE = np.dtype([('t', 'f8'), ('kind', 'u1'), ('note', 'u1'), ('vel', 'u1'), ('ch', 'u1')])
+PlayEvent = Tuple[float, int, int, int, int]  # a PLAY_EVENT_DTYPE row as a tuple
+
+@dataclass(eq=False)  # identity equality: summaries are shared, and used in redraw cache keys
 class MidiSummary:
     bpm: float = 120.0
     time_sig: Tuple[int, int] = (4, 4)
     duration_sec: float = 0.0
     ticks_per_beat: int = 480
-    notes: List[Tuple[float, float, int]] = field(default_factory=list)  # (start_sec, dur_sec, pitch)
-    events: List[Tuple[float, str, int, int]] = field(default_factory=list)  # (time_sec, 'on'/'off', note, vel)
+    # notes as parallel arrays (start_sec, dur_sec, pitch), sorted by start for viewport culling
+    notes_start: np.ndarray = field(default_factory=lambda: np.empty(0, dtype=np.float32))
+    notes_dur: np.ndarray = field(default_factory=lambda: np.empty(0, dtype=np.float32))
+    notes_pitch: np.ndarray = field(default_factory=lambda: np.empty(0, dtype=np.int8))
+    # note events as parallel arrays sorted by time; kind is EV_ON / EV_OFF
+    event_times: np.ndarray = field(default_factory=lambda: np.empty(0))
+    event_kind: np.ndarray = field(default_factory=lambda: np.empty(0, dtype=np.int8))
+    event_note: np.ndarray = field(default_factory=lambda: np.empty(0, dtype=np.uint8))
+    event_vel: np.ndarray = field(default_factory=lambda: np.empty(0, dtype=np.uint8))
     tempo_changes: List[Tuple[float, int]] = field(default_factory=list)  # (t_sec, us_per_beat)
+    # active {note: vel} before event j * ACTIVE_CHECKPOINT_EVERY, for O(log N + K) seeks
+    active_checkpoints: List[Dict[int, int]] = field(default_factory=lambda: [{}])
 
     @classmethod
     def from_file(cls, path: str) -> "MidiSummary":
         mid = mido.MidiFile(path)
         tpq = mid.ticks_per_beat
         default_tempo = 500000  # 120 BPM
-        cur_tempo = default_tempo
-        ts = (4, 4)
-
-        # Prefer first time signature found (for ruler default)
-        for tr in mid.tracks:
-            for msg in tr:
-                if msg.is_meta and msg.type == "time_signature":
-                    ts = (msg.numerator, msg.denominator)
-                    break
-            if ts != (4, 4):
-                break
 
-        merged = mido.merge_tracks(mid.tracks)
-
-        # Build absolute-time events with tempo changes applied on the fly
-        t_sec = 0.0
-        tempo_changes: List[Tuple[float, int]] = [(0.0, default_tempo)]
-        on_stack: Dict[int, List[Tuple[float, int]]] = {}
-        events: List[Tuple[float, str, int, int]] = []
-        notes_tmp: List[Tuple[float, float, int]] = []
-
-        for msg in merged:
-            if msg.time:
-                t_sec += mido.tick2second(msg.time, tpq, cur_tempo)
-            if msg.is_meta and msg.type == "set_tempo":
-                cur_tempo = msg.tempo
-                tempo_changes.append((t_sec, cur_tempo))
-                continue
-            if msg.is_meta:
-                continue
-            if msg.type == "note_on" and msg.velocity > 0:
-                on_stack.setdefault(msg.note, []).append((t_sec, msg.velocity))
-            elif msg.type in ("note_off",) or (msg.type == "note_on" and msg.velocity == 0):
-                lst = on_stack.get(msg.note)
-                if lst:
-                    s, v = lst.pop()
-                    events.append((s, "on", msg.note, v))
-                    events.append((t_sec, "off", msg.note, 0))
-                    notes_tmp.append((s, max(0.01, t_sec - s), msg.note))
+        # Walk each track on its own (no merge_tracks: it copies every message to retime
+        # it), then merge by a stable sort on absolute tick, which keeps merge_tracks'
+        # order: tick first, then track, then position in the track.
+        n = sum(len(track) for track in mid.tracks)
+        ev_tick = np.empty(n, dtype=np.int64)
+        ev_kind = np.empty(n, dtype=np.int8)
+        ev_note = np.empty(n, dtype=np.uint8)
+        ev_vel = np.empty(n, dtype=np.uint8)
+        tempos: List[Tuple[int, int, int]] = []  # (tick, pos, uspb)
+        ts_first: Optional[Tuple[int, int, Tuple[int, int]]] = None  # (tick, pos, (num, den))
+        k = 0
+        pos = 0
+        for track in mid.tracks:
+            tick = 0
+            for msg in track:
+                tick += msg.time
+                pos += 1
+                if msg.is_meta:
+                    if msg.type == "set_tempo":
+                        tempos.append((tick, pos, msg.tempo))
+                    elif msg.type == "time_signature" and (ts_first is None or tick < ts_first[0]):
+                        ts_first = (tick, pos, (msg.numerator, msg.denominator))
+                    continue
+                if msg.type == "note_on" and msg.velocity > 0:
+                    ev_kind[k] = EV_ON
+                elif msg.type in ("note_off", "note_on"):
+                    ev_kind[k] = EV_OFF
+                else:
+                    continue
+                ev_tick[k] = tick
+                ev_note[k] = msg.note
+                ev_vel[k] = msg.velocity
+                k += 1
+        merge = np.argsort(ev_tick[:k], kind="stable")
+        ev_tick, ev_kind, ev_note, ev_vel = ev_tick[merge], ev_kind[merge], ev_note[merge], ev_vel[merge]
+        tempos.sort()
+        tempo_ticks: List[int] = [0] + [t for t, _, _ in tempos]
+        tempo_us: List[int] = [default_tempo] + [us for _, _, us in tempos]
+        ts = ts_first[2] if ts_first else (4, 4)  # first time signature (ruler default)
+        cur_tempo = tempo_us[-1]
+
+        # Piecewise-linear tempo map: seconds at each tempo change, then seconds per event
+        t_ticks = np.asarray(tempo_ticks, dtype=np.int64)
+        sec_per_tick = np.asarray(tempo_us, dtype=np.float64) / (tpq * 1_000_000.0)
+        t_secs = np.concatenate(([0.0], np.cumsum(np.diff(t_ticks) * sec_per_tick[:-1])))
+        seg = np.searchsorted(t_ticks, ev_tick, side="right") - 1
+        ev_sec = t_secs[seg] + (ev_tick - t_ticks[seg]) * sec_per_tick[seg]
+
+        # Pair note_on/note_off per pitch, ordered by the note_off as before
+        on_idx, off_idx = _pair_note_events(ev_kind, ev_note)
+        by_off = np.argsort(off_idx, kind="stable")
+        on_idx, off_idx = on_idx[by_off], off_idx[by_off]
+        on_t, off_t = ev_sec[on_idx], ev_sec[off_idx]
+        durs = np.maximum(0.01, off_t - on_t)
+        pitch = ev_note[on_idx]
+        by_start = np.argsort(on_t, kind="stable")
+
+        # Interleave (on, off) per pair, then stable sort by time
+        times = np.column_stack((on_t, off_t)).ravel()
+        order = np.argsort(times, kind="stable")
+        kinds = np.tile(np.array([EV_ON, EV_OFF], dtype=np.int8), len(on_idx))[order]
+        ev_notes = np.repeat(pitch, 2)[order]
+        vels = np.column_stack((ev_vel[on_idx], np.zeros_like(ev_vel[on_idx]))).ravel()[order]
+        times = times[order]
 
         # Normalize start so first note_on is at 0s
-        events.sort(key=lambda x: x[0])
-        first_on = next((t for t, k, *_ in events if k == "on"), 0.0)
+        first_on = float(on_t.min()) if len(on_t) else 0.0
         if first_on > 0:
-            events = [(t - first_on, k, n, v) for (t, k, n, v) in events]
-            notes_tmp = [(s - first_on, d, p) for (s, d, p) in notes_tmp]
-            tempo_changes = [(max(0.0, t - first_on), us) for (t, us) in tempo_changes]
-        duration = max((t for t, *_ in events), default=0.0)
+            times = times - first_on
+            on_t = on_t - first_on
+            t_secs = np.maximum(0.0, t_secs - first_on)
+        tempo_changes = list(zip(t_secs.tolist(), tempo_us))
+        duration = float(times.max()) if len(times) else 0.0
         bpm = mido.tempo2bpm(cur_tempo)
         return cls(bpm=bpm, time_sig=ts, duration_sec=duration, ticks_per_beat=tpq,
-                   notes=notes_tmp, events=events, tempo_changes=tempo_changes)
+                   notes_start=on_t[by_start].astype(np.float32),
+                   notes_dur=durs[by_start].astype(np.float32),
+                   notes_pitch=pitch[by_start].astype(np.int8), tempo_changes=tempo_changes,
+                   event_times=times, event_kind=kinds, event_note=ev_notes, event_vel=vels,
+                   active_checkpoints=_active_checkpoints(kinds, ev_notes, vels))
+
+    @property
+    def n_events(self) -> int:
+        return len(self.event_times)
+
+    def play_events(self) -> np.ndarray:
+        """Note events as a PLAY_EVENT_DTYPE array on channel 0."""
+        arr = np.zeros(self.n_events, dtype=PLAY_EVENT_DTYPE)
+        arr['t'] = self.event_times
+        arr['kind'] = self.event_kind
+        arr['note'] = self.event_note
+        arr['vel'] = self.event_vel
+        return arr
+
+    def event_tuples(self, start: int = 0, end: Optional[int] = None) -> List[Tuple[float, str, int, int]]:
+        """(time_sec, 'on'/'off', note, vel) tuples for events[start:end]."""
+        sl = slice(start, end)
+        names = ('off', 'on')
+        return [(t, names[k], n, v) for t, k, n, v in zip(
+            self.event_times[sl].tolist(), self.event_kind[sl].tolist(),
+            self.event_note[sl].tolist(), self.event_vel[sl].tolist())]
+
+
+ACTIVE_CHECKPOINT_EVERY = 64
+
+def _apply_note_events(active: Dict[int, int], kind: np.ndarray, note: np.ndarray,
+                       vel: np.ndarray) -> Dict[int, int]:
+    for kd, nt, v in zip(kind.tolist(), note.tolist(), vel.tolist()):
+        if kd == EV_ON:
+            active[nt] = max(1, v)
+        else:
+            active.pop(nt, None)
+    return active
+
+def _active_checkpoints(kind: np.ndarray, note: np.ndarray, vel: np.ndarray,
+                        every: int = ACTIVE_CHECKPOINT_EVERY) -> List[Dict[int, int]]:
+    """Snapshot the active-note set every `every` events (entry j = state before event j*every)."""
+    snaps: List[Dict[int, int]] = [{}]
+    active: Dict[int, int] = {}
+    for j in range(every, len(kind) + 1, every):
+        sl = slice(j - every, j)
+        _apply_note_events(active, kind[sl], note[sl], vel[sl])
+        snaps.append(dict(active))
+    return snaps
+
+def _pair_note_events(kind: np.ndarray, note: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Match each note_off with the latest open note_on of the same pitch (LIFO per pitch).
+
+    Events must be in time order. Returns (on_idx, off_idx) into the input arrays;
+    unmatched note_ons are dropped.
+    """
+    grouped = np.argsort(note, kind="stable")  # by pitch, time order kept within a pitch
+    g_kind, g_note = kind[grouped], note[grouped]
+    steps = np.where(g_kind == EV_ON, 1, -1)
+    csum = np.cumsum(steps)
+    starts = np.flatnonzero(np.r_[True, g_note[1:] != g_note[:-1]]) if len(g_note) else np.empty(0, dtype=np.int64)
+    base = np.repeat(csum[starts] - steps[starts], np.diff(np.r_[starts, len(g_note)]))
+    depth = csum - base  # open notes of this pitch after each event
+    if np.any(depth < 0):
+        # stray note_offs: fall back to an explicit stack walk, one stack per pitch
+        on_stack: List[List[int]] = [[] for _ in range(128)]
+        on_idx, off_idx = [], []
+        for i, (kd, nt) in enumerate(zip(kind.tolist(), note.tolist())):
+            if kd == EV_ON:
+                on_stack[nt].append(i)
+            else:
+                lst = on_stack[nt]
+                if lst:
+                    on_idx.append(lst.pop())
+                    off_idx.append(i)
+        return np.asarray(on_idx, dtype=np.int64), np.asarray(off_idx, dtype=np.int64)
+    # nesting level: an on opens level `depth`, the matching off closes the same level
+    level = np.where(g_kind == EV_ON, depth, depth + 1)
+    by_level = np.lexsort((np.arange(len(g_note)), level, g_note))
+    l_kind, l_note, l_level = g_kind[by_level], g_note[by_level], level[by_level]
+    is_pair = ((l_kind[:-1] == EV_ON) & (l_kind[1:] == EV_OFF)
+               & (l_note[:-1] == l_note[1:]) & (l_level[:-1] == l_level[1:]))
+    src = grouped[by_level]
+    return src[:-1][is_pair], src[1:][is_pair]
+
+# ---- Parsed-summary cache (in-process LRU + on-disk sidecar) ----
+_SIDECAR_SUFFIX = ".midisum.pkl"
+_SIDECAR_VERSION = 7  # bump whenever MidiSummary fields change
+
+@functools.lru_cache(maxsize=8)
+def _load_cached_stat(path: str, mtime: float, size: int) -> MidiSummary:
+    """Parse once per (path, mtime, size). The returned summary is shared; treat it as read-only."""
+    stamp = (_SIDECAR_VERSION, mtime, size)
+    sidecar = path + _SIDECAR_SUFFIX
+    try:
+        with open(sidecar, "rb") as f:
+            saved_stamp, ms = pickle.load(f)
+        if saved_stamp == stamp and isinstance(ms, MidiSummary):
+            return ms
+    except Exception:
+        pass
+    ms = MidiSummary.from_file(path)
+    tmp = sidecar + ".tmp"
+    try:
+        with open(tmp, "wb") as f:
+            pickle.dump((stamp, ms), f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, sidecar)
+    except (OSError, pickle.PicklingError):
+        # read-only location etc.: the in-process cache still applies
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+    return ms
+
+def _load_cached(path: str) -> MidiSummary:
+    path = os.path.abspath(path)
+    st = os.stat(path)
+    return _load_cached_stat(path, st.st_mtime, st.st_size)
+
+# ======================= Piano-roll raster =======================
+NOTE_RGBA = (0x7d, 0xaf, 0xff, 255)  # "#7dafff"
+NOTE_HALF_H = 4
+LANE_TILE_PX = 1024    # lane bitmaps are cut into tiles this wide, cached across scrolls
+LANE_TILE_SPARE = 24   # cached tiles kept beyond the ones on screen, least recently used evicted
+
+def _rgba(color: str) -> Tuple[int, int, int, int]:
+    """'#rrggbb' or '#rgb' -> (r, g, b, 255)."""
+    h = color.lstrip("#")
+    if len(h) == 3:
+        h = "".join(c * 2 for c in h)
+    return int(h[0:2], 16), int(h[2:4], 16), int(h[4:6], 16), 255
+
+def _grid_image(width: int, height: int, measure_xs: np.ndarray, beat_xs: np.ndarray,
+                bg: str, measure_color: str, beat_color: Optional[str] = None,
+                measure_w: int = 1, beat_top: int = 0) -> np.ndarray:
+    """Opaque lane background with vertical measure/beat lines, (height, width, 4) uint8.
+
+    x positions are image-relative; a `measure_w`=2 line covers columns x-1 and x,
+    as Tk draws a width-2 line.
+    """
+    img = np.empty((height, width, 4), dtype=np.uint8)
+    img[:] = _rgba(bg)
+    if beat_color is not None and len(beat_xs):
+        cols = np.floor(beat_xs).astype(np.int64)
+        img[beat_top:, cols[(cols >= 0) & (cols < width)]] = _rgba(beat_color)
+    cols = np.floor(measure_xs).astype(np.int64)
+    for c in (cols - 1, cols)[2 - measure_w:]:
+        img[:, c[(c >= 0) & (c < width)]] = _rgba(measure_color)
+    return img
+
+def _grid_polyline(xs: np.ndarray, y_top: float, y_bot: float) -> List[float]:
+    """Coords for one create_line drawing a vertical line at each x from y_top to y_bot.
+
+    The pen goes down and back up each line and steps to the next along y_bot, so
+    the joins only retrace the lane's bottom edge.
+    """
+    n = len(xs)
+    return np.column_stack((xs, np.full(n, y_bot), xs, np.full(n, y_top), xs, np.full(n, y_bot))).ravel().tolist()
+
+@functools.lru_cache(maxsize=4)
+def _note_extent(ms: MidiSummary) -> Tuple[float, float, float]:
+    """(lowest pitch, pitch span >= 1, longest duration) of a summary's notes, per summary."""
+    pmin, pmax = float(ms.notes_pitch.min()), float(ms.notes_pitch.max())
+    return pmin, max(1.0, pmax - pmin), float(ms.notes_dur.max())
+
+def _rasterize_notes(xs: np.ndarray, ws: np.ndarray, ys: np.ndarray,
+                     width: int, height: int, rgba=NOTE_RGBA,
+                     img: Optional[np.ndarray] = None) -> np.ndarray:
+    """Paint note bars into `img`, or a new transparent (height, width, 4) uint8 image.
+
+    Coordinates are image-relative pixels. Each bar covers [x, x+w) by
+    [y-4, y+4), like the canvas rectangles it replaces; spans are accumulated
+    with a per-row difference array so there is no per-note Python work.
+    """
+    if img is None:
+        img = np.zeros((height, width, 4), dtype=np.uint8)
+    if len(xs) == 0 or width <= 0 or height <= 0:
+        return img
+    # minimum 1px width before clipping, so bars ending left of the image don't leave a stub
+    start = np.floor(xs).astype(np.int64)
+    x1 = np.clip(np.maximum(np.floor(xs + ws + 0.5).astype(np.int64), start + 1), 0, width)
+    x0 = np.clip(start, 0, width)
+    rows = np.round(ys).astype(np.int64)[:, None] + np.arange(-NOTE_HALF_H, NOTE_HALF_H)
+    keep = (rows >= 0) & (rows < height) & (x1 > x0)[:, None]
+    r = rows[keep]
+    c0 = np.broadcast_to(x0[:, None], rows.shape)[keep]
+    c1 = np.broadcast_to(x1[:, None], rows.shape)[keep]
+    diff = np.zeros((height, width + 1), dtype=np.int32)
+    np.add.at(diff, (r, c0), 1)
+    np.add.at(diff, (r, c1), -1)
+    img[np.cumsum(diff[:, :width], axis=1) > 0] = rgba
+    return img
 
 # ======================= Metronome clicks =======================
-def build_click_events(tempo_changes: List[Tuple[float, int]], end_time: float,
+CLICK_NOTE_STRONG = 37  # Side Stick
+CLICK_NOTE_WEAK = 42    # Closed Hi-Hat
+CLICK_LEN_SEC = 0.03
+
+
+def build_click_arrays(tempo_changes: List[Tuple[float, int]], end_time: float,
                        beats_per_measure: float, accent_vel: int = 115, weak_vel: int = 85):
-    CLICK_NOTE_STRONG = 37  # Side Stick
-    CLICK_NOTE_WEAK = 42    # Closed Hi-Hat
-    ch9 = 9  # GM percussion channel (10th)
+    """Beat times, notes and velocities for the metronome, one row per beat.
 
-    segs: List[Tuple[float, float, int]] = []
+    Each tempo segment is generated with a single arange; downbeats are counted
+    over the concatenated beats so the pattern continues across tempo changes.
+    """
+    per_measure = max(1, int(round(beats_per_measure)))
+    seg_times: List[np.ndarray] = []
     for i, (t0, uspb) in enumerate(tempo_changes):
         t1 = end_time if i + 1 == len(tempo_changes) else tempo_changes[i + 1][0]
-        segs.append((t0, t1, uspb))
-
-    beat_events: List[Tuple[float, str, int, int, int]] = []
-    beat_idx = 0
-    for t0, t1, uspb in segs:
+        stop = min(t1, end_time) - 1e-9
         spb = uspb / 1_000_000.0
-        t = t0
-        while t < t1 - 1e-9 and t < end_time - 1e-9:
-            is_downbeat = (beat_idx % int(round(beats_per_measure)) == 0)
-            note = CLICK_NOTE_STRONG if is_downbeat else CLICK_NOTE_WEAK
-            vel = accent_vel if is_downbeat else weak_vel
-            beat_events.append((t, 'click_on', note, vel, ch9))
-            beat_events.append((t + 0.03, 'click_off', note, 0, ch9))
-            t += spb
-            beat_idx += 1
-    beat_events.sort(key=lambda x: x[0])
-    return beat_events
+        if stop <= t0 or spb <= 0:
+            continue
+        beats = t0 + np.arange(int(math.ceil((stop - t0) / spb))) * spb
+        beats = beats[beats < stop]
+        seg_times.append(beats)
+    on_times = np.concatenate(seg_times) if seg_times else np.empty(0)
+    is_down = (np.arange(len(on_times)) % per_measure) == 0
+    notes = np.where(is_down, CLICK_NOTE_STRONG, CLICK_NOTE_WEAK)
+    vels = np.where(is_down, accent_vel, weak_vel)
+    return on_times, on_times + CLICK_LEN_SEC, notes, vels
+
+
+def build_click_play_events(tempo_changes: List[Tuple[float, int]], end_time: float,
+                            beats_per_measure: float, accent_vel: int = 115,
+                            weak_vel: int = 85) -> np.ndarray:
+    """Metronome as a PLAY_EVENT_DTYPE array on ch10, (on, off) per beat in beat order."""
+    on_t, off_t, notes, vels = build_click_arrays(tempo_changes, end_time, beats_per_measure,
+                                                  accent_vel, weak_vel)
+    arr = np.zeros(2 * len(on_t), dtype=PLAY_EVENT_DTYPE)
+    arr['t'][0::2], arr['t'][1::2] = on_t, off_t
+    arr['kind'][0::2], arr['kind'][1::2] = EV_CLICK_ON, EV_CLICK_OFF
+    arr['note'][0::2] = arr['note'][1::2] = notes
+    arr['vel'][0::2] = vels
+    arr['ch'] = 9  # GM percussion channel (10th)
+    return arr
+
+
+def build_click_events(tempo_changes: List[Tuple[float, int]], end_time: float,
+                       beats_per_measure: float, accent_vel: int = 115, weak_vel: int = 85):
+    """build_click_play_events as time-ordered (t, 'click_on'/'click_off', note, vel, ch) tuples."""
+    arr = build_click_play_events(tempo_changes, end_time, beats_per_measure, accent_vel, weak_vel)
+    arr = arr[np.argsort(arr['t'], kind="stable")]  # stable: each on stays ahead of its off
+    names = {EV_CLICK_ON: 'click_on', EV_CLICK_OFF: 'click_off'}
+    return [(t, names[kind], note, vel, ch) for t, kind, note, vel, ch in arr.tolist()]
 
 # ======================= FluidSynth wrapper =======================
+PCM_BLOCK_FRAMES = 512   # frames per rendered block (~11.6 ms at 44.1 kHz)
+PCM_QUEUE_DEPTH = 8      # blocks buffered between the render thread and the device
+SEQ_LOOKAHEAD_SEC = 0.2  # how far ahead events are handed to the FluidSynth sequencer
+SEQ_LATENCY_MS = 20      # offset of the first scheduled event from "now"
+NPS_CAP = 2000           # max note_ons per channel within NPS_WINDOW_SEC
+NPS_WINDOW_SEC = 1.0
+
+
+class PcmOutput:
+    """Bounded queue of int16 stereo blocks drained by a sounddevice callback.
+
+    The render thread fills the queue ahead of the device; the callback only
+    copies bytes, so it never waits on Python work.  An empty queue plays silence.
+    """
+    def __init__(self, sample_rate: int = 44100, block_frames: int = PCM_BLOCK_FRAMES,
+                 depth: int = PCM_QUEUE_DEPTH):
+        if not HAS_SOUNDDEVICE:
+            raise RuntimeError("sounddevice not installed (pip install sounddevice)")
+        self.block_frames = block_frames
+        self._q: "queue.Queue[bytes]" = queue.Queue(maxsize=depth)
+        self._silence = bytes(block_frames * 4)
+        self.stream = sounddevice.RawOutputStream(
+            samplerate=sample_rate, blocksize=block_frames, channels=2,
+            dtype="int16", callback=self._callback)
+        self.stream.start()
+
+    def _callback(self, outdata, frames, time_info, status):
+        try:
+            data = self._q.get_nowait()
+        except queue.Empty:
+            data = self._silence
+        n = len(outdata)
+        if len(data) < n:
+            data = data + bytes(n - len(data))
+        outdata[:] = data[:n]
+
+    def put(self, block: bytes, stop_evt: threading.Event) -> bool:
+        """Block until there is room for `block`; False if `stop_evt` fired first."""
+        while not stop_evt.is_set():
+            try:
+                self._q.put(block, timeout=0.05)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def flush(self):
+        while True:
+            try:
+                self._q.get_nowait()
+            except queue.Empty:
+                return
+
+    def close(self):
+        self.flush()
+        try:
+            self.stream.stop()
+            self.stream.close()
+        except Exception:
+            pass
+
+
+class NpsLimiter:
+    """Per-channel notes-per-second cap for dense (black-MIDI style) files.
+
+    Once a channel has `cap` note_ons inside the sliding window, a new note_on
+    only gets through if it is louder than the quietest one counted, which is then
+    uncounted; quieter ones are dropped, along with their matching note_off.
+    """
+    def __init__(self, cap: int = NPS_CAP, window: float = NPS_WINDOW_SEC):
+        self.cap = cap
+        self.window = window
+        self.reset()
+
+    def reset(self):
+        self._uid = 0
+        self._recent: Dict[int, deque] = {}            # ch -> deque[(t, uid)] in time order
+        self._heap: Dict[int, List[Tuple[int, int]]] = {}  # ch -> heap of (vel, uid), lazily pruned
+        self._live: Dict[int, Dict[int, int]] = {}      # ch -> {uid: vel} counted in the window
+        self._dropped: Dict[Tuple[int, int], int] = {}  # (ch, note) -> note_offs to swallow
+
+    def admit(self, ev: PlayEvent) -> bool:
+        t, kind, note, vel, ch = ev
+        if kind in (EV_OFF, EV_CLICK_OFF):
+            key = (ch, note)
+            pending = self._dropped.get(key, 0)
+            if pending:
+                self._dropped[key] = pending - 1
+                return False
+            return True
+        recent = self._recent.setdefault(ch, deque())
+        heap = self._heap.setdefault(ch, [])
+        live = self._live.setdefault(ch, {})
+        cutoff = t - self.window
+        while recent and recent[0][0] < cutoff:
+            live.pop(recent.popleft()[1], None)
+        if len(live) >= self.cap:
+            while heap[0][1] not in live:
+                heapq.heappop(heap)
+            if vel <= heap[0][0]:
+                key = (ch, note)
+                self._dropped[key] = self._dropped.get(key, 0) + 1
+                return False
+            live.pop(heapq.heappop(heap)[1])
+        elif len(heap) > 2 * len(live) + 64:
+            heap[:] = [(v, u) for u, v in live.items()]
+            heapq.heapify(heap)
+        self._uid += 1
+        recent.append((t, self._uid))
+        heapq.heappush(heap, (vel, self._uid))
+        live[self._uid] = vel
+        return True
+
+
 class FluidPlayer:
     def __init__(self, soundfont_path: str, driver: Optional[str] = None,
-                 sample_rate: int = 44100, gain: float = 0.9):
+                 sample_rate: int = 44100, gain: float = 0.9, pcm: bool = False):
+        """`pcm=True` skips FluidSynth's own audio driver; blocks are pulled with
+        get_samples() and played through a PcmOutput instead."""
         if not HAS_FLUID:
             raise RuntimeError("pyFluidSynth not installed (pip install pyFluidSynth)")
         if not os.path.exists(soundfont_path):
             raise FileNotFoundError(soundfont_path)
-        self.on_notes = set()
+        self.on_notes = bytearray(16 * 128)  # 1 at ch * 128 + note while sounding
+        # pyFluidSynth is not thread-safe; UI and audio threads both call in, one at a time
+        self._lock = threading.RLock()
+        self.sample_rate = sample_rate
+        self.pcm = pcm
+        self.out: Optional[PcmOutput] = None
         if hasattr(fluidsynth, "Settings"):
             settings = fluidsynth.Settings()
             if driver:
@@ -219,10 +708,14 @@ class FluidPlayer:
             settings.setnum('synth.sample-rate', sample_rate)
             settings.setnum('synth.gain', gain)
             self.fs = fluidsynth.Synth(settings)
-            self.fs.start()
+            if not pcm:
+                self.fs.start()
         else:
             self.fs = fluidsynth.Synth(samplerate=sample_rate, gain=gain)
-            self.fs.start(driver or os.environ.get("FLUIDSYNTH_DRIVER"))
+            if not pcm:
+                self.fs.start(driver or os.environ.get("FLUIDSYNTH_DRIVER"))
+        if pcm:
+            self.out = PcmOutput(sample_rate)
         self.sfid = self.fs.sfload(soundfont_path)
         self.fs.program_select(0, self.sfid, 0, 0)
         try:
@@ -230,31 +723,130 @@ class FluidPlayer:
             self.fs.cc(0, 10, 64)
         except Exception:
             pass
+        # With the synth's own driver, notes are queued on FluidSynth's sequencer ahead of
+        # time (ms ticks, advanced by the synth's sample clock) rather than sent on the beat
+        self.seq = None
+        self._seq_dest = None
+        if not pcm:
+            self._new_sequencer()
+
+    def _new_sequencer(self):
+        if not hasattr(fluidsynth, "Sequencer"):
+            return
+        try:
+            self.seq = fluidsynth.Sequencer(time_scale=1000, use_system_timer=False)
+            self._seq_dest = self.seq.register_fluidsynth(self.fs)
+        except Exception as e:
+            log.warning("[sequencer disabled] %s", e)
+            self.seq = None
+            self._seq_dest = None
+
+    def seq_tick(self) -> int:
+        with self._lock:
+            return int(self.seq.get_tick())
+
+    def schedule(self, events: List[PlayEvent], base_tick: int, t0: float):
+        """Queue events on the sequencer at base_tick + (t - t0) ms, under one lock acquisition."""
+        if not events:
+            return
+        with self._lock:
+            seq_on, seq_off, dest = self.seq.note_on, self.seq.note_off, self._seq_dest
+            for t, kind, note, vel, ch in events:
+                tick = base_tick + int(round((t - t0) * 1000.0))
+                if kind == EV_ON or kind == EV_CLICK_ON:
+                    seq_on(time=tick, absolute=True, channel=ch, key=note, velocity=max(1, vel), dest=dest)
+                else:
+                    seq_off(time=tick, absolute=True, channel=ch, key=note, dest=dest)
+
+    def clear_scheduled(self):
+        """Drop events queued on the sequencer but not yet played."""
+        with self._lock:
+            if self.seq is None:
+                return
+            if hasattr(self.seq, "remove_events"):
+                self.seq.remove_events(dest=self._seq_dest)
+                return
+            try:
+                self.seq.delete()
+            except Exception:
+                pass
+            self._new_sequencer()
 
     def note_on(self, note: int, vel: int = 96, ch: int = 0):
-        self.on_notes.add((ch, note))
-        self.fs.noteon(ch, note, vel)
+        with self._lock:
+            self.on_notes[ch * 128 + note] = 1
+            self.fs.noteon(ch, note, vel)
 
     def note_off(self, note: int, ch: int = 0):
-        if (ch, note) in self.on_notes:
-            self.on_notes.remove((ch, note))
-        self.fs.noteoff(ch, note)
+        with self._lock:
+            self.on_notes[ch * 128 + note] = 0
+            self.fs.noteoff(ch, note)
+
+    def send(self, events: List[PlayEvent]):
+        """Apply note on/off events now, taking the lock once for the whole batch."""
+        if not events:
+            return
+        with self._lock:
+            noteon, noteoff = self.fs.noteon, self.fs.noteoff
+            on_notes = self.on_notes
+            for _, kind, note, vel, ch in events:
+                if kind == EV_ON or kind == EV_CLICK_ON:
+                    on_notes[ch * 128 + note] = 1
+                    noteon(ch, note, max(1, vel))
+                else:
+                    on_notes[ch * 128 + note] = 0
+                    noteoff(ch, note)
 
     def all_notes_off(self):
         # Panic: all-sound-off and all-notes-off on all 16 channels
-        for ch in range(16):
+        with self._lock:
+            cc = self.fs.cc
             try:
-                self.fs.cc(ch, 120, 0)  # All Sound Off
-                self.fs.cc(ch, 123, 0)  # All Notes Off
+                for ch in range(16):
+                    cc(ch, 120, 0)  # All Sound Off
+                    cc(ch, 123, 0)  # All Notes Off
             except Exception:
-                pass
-        self.on_notes.clear()
+                pass  # the synth is gone; there is nothing left sounding
+            self.on_notes[:] = bytes(len(self.on_notes))
+
+    def get_samples(self, frames: int) -> np.ndarray:
+        """Render `frames` frames of interleaved int16 stereo (shape (frames, 2))."""
+        with self._lock:
+            buf = np.asarray(self.fs.get_samples(frames), dtype=np.int16)
+        return buf.reshape(-1, 2)
 
     def stop(self):
-        self.all_notes_off()
-        self.fs.delete()
+        with self._lock:
+            self.all_notes_off()
+            if self.seq is not None:
+                try:
+                    self.seq.delete()
+                except Exception:
+                    pass
+                self.seq = None
+            if self.out:
+                self.out.close()
+                self.out = None
+            self.fs.delete()
 
 # ======================= Main App =======================
+UI_FRAME_MS = 16  # playhead refresh period (~60 Hz)
+_AUDIO_SHUTDOWN = object()  # job that ends the audio worker
+
+# per-kind (rect tags, text tags, text options); rects carry 'ann' for hit testing
+_ANN_ITEM_STYLE = {
+    "ins": (("ann_rect", "ins", "ann", "lane_ann_items"), ("ann_text", "lane_ann_items"),
+            {"fill": "#eeeeee"}),
+    "cd": (("ann_rect", "cd", "ann", "lane_ann_items"), ("cd", "lane_ann_items"),
+           {"fill": "#7a4b00", "font": ("TkDefault", 9, "bold")}),
+}
+
+@functools.lru_cache(maxsize=16)
+def _file_label(path: str) -> Tuple[str, str]:
+    """(name, stem) of a path, parsed once per distinct path for the labels/export name."""
+    name = os.path.basename(path)
+    return name, os.path.splitext(name)[0]
+
 class DAWAnnotator(tk.Tk):
     def __init__(self):
         super().__init__()
@@ -275,21 +867,59 @@ class DAWAnnotator(tk.Tk):
         self.total_measures = tk.IntVar(value=128)
         self.px_per_beat = tk.DoubleVar(value=40)
         self.metronome_on = tk.BooleanVar(value=True)
-
-        # Playback control
-        self._audio_thread: Optional[threading.Thread] = None
+        # Derived values cached off the Tk vars (each .get() is a Tcl round-trip)
+        self._tempo_cache: Optional[Tuple[float, float, float]] = None  # (bpm, beats/measure, measure sec)
+        self._pxpb_cache: Optional[float] = None
+        self._total_meas_cache: Optional[int] = None
+        self._geom_cache: Optional[Tuple[float, float, float, float]] = None  # see _geom
+        for var in (self.bpm, self.ts_num, self.ts_den):
+            var.trace_add("write", self._invalidate_tempo_cache)
+        self.px_per_beat.trace_add("write", self._invalidate_tempo_cache)
+        self.total_measures.trace_add("write", self._invalidate_tempo_cache)
+
+        # Playback control: one persistent worker runs each play job (a synth or None)
+        self._audio_jobs: "queue.SimpleQueue[object]" = queue.SimpleQueue()
+        self._audio_idle = threading.Event()  # clear while a play job is queued or running
+        self._audio_idle.set()
+        # jobs are tagged with the stop generation they were queued in: a stop bumps
+        # _audio_gen, so a job queued before it never starts, and only the newest
+        # queued job (_audio_queued) may report idle
+        self._audio_lock = threading.Lock()
+        self._audio_gen = 0
+        self._audio_queued = 0
+        self._audio_thread = threading.Thread(target=self._audio_worker, daemon=True)
+        self._audio_thread.start()
         self._stop_evt = threading.Event()
         self._pause_evt = threading.Event()
+        # set on pause/stop/seek so the audio thread's waits return at once
+        self._wake_evt = threading.Event()
         self._start_t = 0.0
         self._paused_elapsed = 0.0
         self._play_length_sec = 0.0
-
-        # Shared synth (prevents overlap across threads)
+        self._active_cache: Optional[Tuple[MidiSummary, int, Dict[int, int]]] = None  # (midi, end_idx, active)
+        self._nps = NpsLimiter()
+        self._merged_cache: Optional[Tuple[tuple, np.ndarray]] = None  # (inputs key, sorted play events)
+        # the audio thread never touches Tk: it reads this snapshot (taken in on_play) and
+        # picks up later var writes as dicts from _audio_cmd_q
+        self._audio_state = types.SimpleNamespace(bpm=120.0, beats_per_measure=4.0, metronome=True)
+        self._audio_cmd_q: "queue.SimpleQueue[dict]" = queue.SimpleQueue()
+        self.metronome_on.trace_add(
+            "write", lambda *_: self._audio_cmd_q.put({"metronome": bool(self.metronome_on.get())}))
+
+        # Shared synth (prevents overlap across threads); built off the UI thread
         self._fs_shared: Optional[FluidPlayer] = None
-        self._ensure_synth()
+        self._fs_lock = threading.Lock()
+        self._sf2_loading: Optional[str] = None  # path being loaded in the background
+        self._sf2_failed: Optional[str] = None   # last path that failed, not retried
 
         # UI loop handle
         self._ui_after = None
+        self._next_frame_t = 0.0  # perf_counter deadline of the next _ui_loop tick
+        # per-tick caches for _ui_loop; reset by _invalidate_canvas_cache
+        self._last_playhead_x: Optional[int] = None
+        self._cv_size: Optional[Tuple[int, int]] = None
+        self._world_w: Optional[float] = None
+        self._last_pos_text = ""
 
         # Selection (measure range)
         self.sel_start_measure: Optional[int] = None
@@ -313,10 +943,33 @@ class DAWAnnotator(tk.Tk):
         self._lb_edit_index: Optional[int] = None
         self._lb_edit_old_text: Optional[str] = None
 
+        self._list_rows: Dict[str, List[str]] = {}  # listbox path -> rows it shows, see _refresh_lists
+        self._ann_items: Dict[tuple, Tuple[int, int, tuple]] = {}  # _rect_map key -> (rect id, text id, spec)
+        # hit-test index over the annotation rects, rebuilt by _sync_annotation_items
+        self._ann_hits: List[Tuple[float, float, float, float, bool, int]] = []  # (x0, x1, y0, y1, is cd, rect id)
+        self._ann_hit_x0: List[float] = []
+        self._ann_hit_w = 0.0  # widest rect, bounds the backwards scan
+        # Canvas x-range (px) covered by the last redraw; scrolling outside it redraws
+        self._drawn_px: Tuple[float, float] = (0.0, 0.0)
+        self._cull_redraw_pending = False
+        # (lane, layout key, tile index) -> PhotoImage, in LRU order; Tk needs the references kept
+        self._lane_tiles: "OrderedDict[tuple, object]" = OrderedDict()
+        self._tile_items: Dict[tuple, int] = {}  # tile key -> image item currently on the canvas
+        self._ruler_labels: Dict[int, Tuple[int, float]] = {}  # measure -> (text item, x)
+        # lane tag -> inputs of its last draw; see _lane_stale
+        self._draw_cache: Dict[str, tuple] = {}
+        self._zoom_after: Optional[str] = None  # pending throttled zoom redraw
+        self._pan_after: Optional[str] = None  # pending coalesced wheel pan, see _queue_pan
+        self._pending_dx = 0.0
+        self._redraw_pending = False  # _redraw_all queued with after_idle
+        self._cache_pxps = 1.0  # px per second, refreshed by _redraw_all
+        self._cache_ppm = 1.0   # px per measure, refreshed by _redraw_all
+
         self._build_ui()
         self._redraw_all()
         # Set the sf2 path to default path
-        self.sf2_lbl.config(text=os.path.basename(self.sf2_path))
+        self.sf2_lbl.config(text=_file_label(self.sf2_path)[0])
+        self._ensure_synth()
 
         # Ensure synth is cleaned up on close
         self.protocol("WM_DELETE_WINDOW", self._on_close)
@@ -331,39 +984,94 @@ class DAWAnnotator(tk.Tk):
 
     # -------- Synth helpers --------
     def _ensure_synth(self) -> Optional[FluidPlayer]:
+        """Return the shared synth, or None while it is (re)loading; never blocks on sf2 I/O."""
         if not (HAS_FLUID and self.sf2_path):
             return None
-        if self._fs_shared is None:
+        with self._fs_lock:
+            fs = self._fs_shared
+        if fs is None and self._sf2_loading is None and self._sf2_failed != self.sf2_path:
+            self._start_sf2_load(self.sf2_path)
+        return fs
+
+    def _start_sf2_load(self, path: str):
+        self._sf2_loading = path
+        self.play_btn.state(["disabled"])
+        self.sf2_lbl.config(text=f"loading {_file_label(path)[0]}…")
+        self.sf2_progress.pack(side=tk.LEFT, padx=4, after=self.sf2_lbl)
+        self.sf2_progress.start(12)
+        threading.Thread(target=self._load_sf2_bg, args=(path,), daemon=True).start()
+
+    def _load_sf2_bg(self, path: str):
+        player = None
+        try:
+            driver = os.environ.get("FLUIDSYNTH_DRIVER", None)
+            log.info("driver path: %s", driver)
+            log.info("sf2 path: %s", path)
+            # Buffered PCM output when sounddevice is available; DAW_AUDIO_OUTPUT=driver
+            # keeps FluidSynth's own audio driver.
+            use_pcm = HAS_SOUNDDEVICE and os.environ.get("DAW_AUDIO_OUTPUT", "pcm") != "driver"
             try:
-                driver = os.environ.get("FLUIDSYNTH_DRIVER", None)
-                print(f"driver path: {driver}")
-                print(f"sf2 path: {self.sf2_path}")
-                self._fs_shared = FluidPlayer(self.sf2_path, driver=driver)
+                player = FluidPlayer(path, driver=driver, pcm=use_pcm)
             except Exception as e:
-                print("[fluidsynth disabled]", e)
-                self._fs_shared = None
-        return self._fs_shared
+                if not use_pcm:
+                    raise
+                log.warning("[pcm output disabled] %s", e)
+                player = FluidPlayer(path, driver=driver)
+        except Exception as e:
+            log.warning("[fluidsynth disabled] %s", e)
+        try:
+            self.after(0, self._on_sf2_loaded, path, player)
+        except (RuntimeError, tk.TclError):
+            # window closed while loading
+            if player:
+                player.stop()
+
+    def _on_sf2_loaded(self, path: str, player: Optional[FluidPlayer]):
+        self._sf2_loading = None
+        self.sf2_progress.stop()
+        self.sf2_progress.pack_forget()
+        self.play_btn.state(["!disabled"])
+        if path != self.sf2_path:
+            # another SoundFont was picked meanwhile; load that one instead
+            if player:
+                player.stop()
+            self._ensure_synth()
+            return
+        if player is None:
+            self._sf2_failed = path
+            self.sf2_lbl.config(text=f"{_file_label(path)[0]} (failed)")
+            return
+        with self._fs_lock:
+            self._fs_shared = player
+        self.sf2_lbl.config(text=_file_label(path)[0])
 
     def _all_notes_off(self):
         fs = self._ensure_synth()
         if fs:
+            # all_notes_off holds the player's lock, so it never lands mid-call on the audio thread
             fs.all_notes_off()
 
+    def _audio_playing(self) -> bool:
+        return not self._audio_idle.is_set()
+
     def _stop_and_join_audio(self):
-        if self._audio_thread and self._audio_thread.is_alive():
+        # stop the current play job; the worker thread itself stays up for the next one
+        with self._audio_lock:
+            self._audio_gen += 1
             self._stop_evt.set()
-            try:
-                self._audio_thread.join(timeout=0.5)
-            except Exception:
-                pass
-        self._audio_thread = None
-        self._stop_evt.clear()
+        self._wake_evt.set()
+        if self._audio_idle.wait(timeout=0.5):
+            self._stop_evt.clear()
+        # else the job is still winding down: _stop_evt stays set until it has
+        # exited, and the worker clears it when it starts the next current job
         self._pause_evt.clear()
+        self._wake_evt.clear()
         self._all_notes_off()
         self._cancel_ui_loop()
 
     def _on_close(self):
         self._stop_and_join_audio()
+        self._audio_jobs.put(_AUDIO_SHUTDOWN)
         if self._fs_shared:
             try:
                 self._fs_shared.stop()
@@ -386,7 +1094,7 @@ class DAWAnnotator(tk.Tk):
         self.sel_start_measure, self.sel_end_measure = sel
         self._clear_all_selections()
         self._refresh_lists()
-        self._redraw_all()
+        self._schedule_redraw()
     """
     def _current_state_snapshot(self) -> dict:
         doc_copy = copy.deepcopy(self.doc)
@@ -394,7 +1102,8 @@ class DAWAnnotator(tk.Tk):
             "doc": doc_copy,
             "sel": (self.sel_start_measure, self.sel_end_measure),
             # --- NEW: capture MIDI + transport/UI state so it survives undo/redo ---
-            "midi": copy.deepcopy(self.midi) if self.midi is not None else None,
+            # MidiSummary is shared with the load cache and never mutated, so keep a reference
+            "midi": self.midi,
             "midi_path": self.midi_path,
             "bpm": float(self.bpm.get()),
             "ts": (int(self.ts_num.get()), int(self.ts_den.get())),
@@ -412,7 +1121,7 @@ class DAWAnnotator(tk.Tk):
         self.sel_start_measure, self.sel_end_measure = sel
 
         # --- NEW: restore MIDI + transport/UI vars ---
-        self.midi = copy.deepcopy(snap.get("midi", None))
+        self.midi = snap.get("midi", None)
         self.midi_path = snap.get("midi_path", None)
 
         bpm = snap.get("bpm", None)
@@ -482,7 +1191,8 @@ class DAWAnnotator(tk.Tk):
         # Transport leftmost
         btn_style = dict(width=3)
         ttk.Button(top, text="≪", command=self.on_reset, **btn_style).pack(side=tk.LEFT)
-        ttk.Button(top, text=">", command=self.on_play, **btn_style).pack(side=tk.LEFT, padx=2)
+        self.play_btn = ttk.Button(top, text=">", command=self.on_play, **btn_style)
+        self.play_btn.pack(side=tk.LEFT, padx=2)
         ttk.Button(top, text="||", command=self.on_pause, **btn_style).pack(side=tk.LEFT, padx=2)
         ttk.Button(top, text="■", command=self.on_stop, **btn_style).pack(side=tk.LEFT, padx=2)
 
@@ -495,6 +1205,8 @@ class DAWAnnotator(tk.Tk):
         ttk.Button(top, text="SoundFont", command=self.on_pick_sf2).pack(side=tk.LEFT, padx=(12, 2))
         self.sf2_lbl = ttk.Label(top, text="(optional)")
         self.sf2_lbl.pack(side=tk.LEFT, padx=4)
+        # shown only while a SoundFont loads
+        self.sf2_progress = ttk.Progressbar(top, mode="indeterminate", length=60)
 
         ttk.Separator(top, orient=tk.VERTICAL).pack(side=tk.LEFT, fill=tk.Y, padx=8)
         ttk.Checkbutton(top, text="Metronome", variable=self.metronome_on).pack(side=tk.LEFT, padx=6)
@@ -517,18 +1229,21 @@ class DAWAnnotator(tk.Tk):
 
         ttk.Separator(top, orient=tk.VERTICAL).pack(side=tk.LEFT, fill=tk.Y, padx=8)
         ttk.Label(top, text="Zoom (px/beat)").pack(side=tk.LEFT)
-        ttk.Scale(top, from_=10, to=120, variable=self.px_per_beat, orient=tk.HORIZONTAL, command=lambda e: self._redraw_all()).pack(side=tk.LEFT, padx=8, fill=tk.X, expand=True)
+        ttk.Scale(top, from_=10, to=120, variable=self.px_per_beat, orient=tk.HORIZONTAL, command=self._on_zoom_scale).pack(side=tk.LEFT, padx=8, fill=tk.X, expand=True)
 
         # Canvas
         container = ttk.Frame(self)
         container.pack(fill=tk.BOTH, expand=True, padx=10, pady=8)
-        self.canvas = tk.Canvas(container, bg="#ffffff", highlightthickness=0)
+        self.canvas = tk.Canvas(container, bg="#ffffff", highlightthickness=0, borderwidth=0)
         self.hbar = ttk.Scrollbar(container, orient=tk.HORIZONTAL, command=self.canvas.xview)
-        self.canvas.configure(xscrollcommand=self.hbar.set)
+        self.canvas.configure(xscrollcommand=self._on_xscroll)
         self.canvas.pack(side=tk.TOP, fill=tk.BOTH, expand=True)
         self.hbar.pack(side=tk.BOTTOM, fill=tk.X)
+        # measure selection band: one item for the app's lifetime, moved/hidden in place
+        self._sel_band = self.canvas.create_rectangle(0, 0, 0, 0, state="hidden", fill="#dfe8ff",
+                                                      outline="#7dafff", tags=("lane_sel",))
 
-        self.canvas.bind("<Configure>", lambda e: self._redraw_all())
+        self.canvas.bind("<Configure>", self._on_canvas_configure)
         self.canvas.bind("<Button-1>", self.on_canvas_down)
         self.canvas.bind("<FocusIn>", lambda e: None)
         self.canvas.bind("<B1-Motion>", self.on_canvas_drag)
@@ -635,41 +1350,64 @@ class DAWAnnotator(tk.Tk):
 
     # -------- Drawing & helpers --------
     def _on_params_changed(self):
-        self._redraw_all()
+        self._schedule_redraw()
 
     def _timeline_pixels(self) -> Tuple[int, int, int, int, int]:
         W = max(1, int(self.canvas.winfo_width()))
         H = max(1, int(self.canvas.winfo_height()))
         return W, H, 28, 300, 90
 
+    def _invalidate_tempo_cache(self, *_):
+        self._tempo_cache = None
+        self._pxpb_cache = None
+        self._total_meas_cache = None
+        self._geom_cache = None
+
+    def _tempo(self) -> Tuple[float, float, float]:
+        """(bpm, beats per measure, measure length in seconds), recomputed after a var write."""
+        if self._tempo_cache is None:
+            bpm = float(self.bpm.get())
+            tsn, tsd = int(self.ts_num.get()), int(self.ts_den.get())
+            beats_per_measure = (4 / tsd) * tsn
+            self._tempo_cache = (bpm, beats_per_measure, (60.0 / bpm) * beats_per_measure)
+        return self._tempo_cache
+
+    def _pxpb(self) -> float:
+        if self._pxpb_cache is None:
+            self._pxpb_cache = float(self.px_per_beat.get())
+        return self._pxpb_cache
+
+    def _total_measures(self) -> int:
+        if self._total_meas_cache is None:
+            self._total_meas_cache = int(self.total_measures.get())
+        return self._total_meas_cache
+
     def _beats_measures(self):
-        bpm = float(self.bpm.get())
-        tsn, tsd = int(self.ts_num.get()), int(self.ts_den.get())
-        beats_per_measure = (4 / tsd) * tsn
+        bpm, beats_per_measure, _ = self._tempo()
         return bpm, beats_per_measure
 
+    def _geom(self) -> Tuple[float, float, float, float]:
+        """(px per second, seconds per px, px per beat, beats per measure), kept until a var write."""
+        if self._geom_cache is None:
+            bpm, bpmr, _ = self._tempo()
+            pxpb = self._pxpb()
+            self._geom_cache = ((bpm / 60.0) * pxpb, (60.0 / max(1e-9, bpm)) / max(1e-9, pxpb), pxpb, bpmr)
+        return self._geom_cache
+
     def _x_for_time(self, sec: float) -> float:
-        bpm, _ = self._beats_measures()
-        beats = sec * (bpm / 60.0)
-        return beats * float(self.px_per_beat.get())
+        return sec * self._geom()[0]
 
     def _time_for_x(self, x: float) -> float:
-        pxpb = float(self.px_per_beat.get())
-        bpm, _ = self._beats_measures()
-        beats = x / max(1e-9, pxpb)
-        return beats * (60.0 / max(1e-9, bpm))
+        return x * self._geom()[1]
 
     def _x_for_measure(self, m: float) -> float:
-        _, bpmr = self._beats_measures()
-        beats_from_start = (m - 1) * bpmr
-        return beats_from_start * float(self.px_per_beat.get())
+        _, _, pxpb, bpmr = self._geom()
+        return (m - 1) * bpmr * pxpb
 
     def _measure_at_x(self, x: float) -> int:
-        pxpb = float(self.px_per_beat.get())
-        _, bpmr = self._beats_measures()
-        beats = x / pxpb
-        m = int(beats // bpmr) + 1
-        return max(1, min(m, int(self.total_measures.get())))
+        _, _, pxpb, bpmr = self._geom()
+        m = int((x / pxpb) // bpmr) + 1
+        return max(1, min(m, self._total_measures()))
 
     # --- Selection visuals (multi-rect) ---
     def _clear_canvas_selection_visual(self):
@@ -719,6 +1457,8 @@ class DAWAnnotator(tk.Tk):
         return max(1, int(beats // beats_per_measure) + 1)
 
     def _set_playhead_time(self, sec: float):
+        self._last_playhead_x = None
+        self._last_pos_text = ""
         self._playhead_sec = max(0.0, float(sec))
         self._paused_elapsed = max(0.0, float(sec))
         x = self._x_for_time(self._paused_elapsed)
@@ -732,9 +1472,7 @@ class DAWAnnotator(tk.Tk):
         self.pos_lbl.config(text=f"t={self._paused_elapsed:.2f}s · m={m_now}")
         # auto-scroll
         view_left, view_right = self.canvas.xview()
-        cv_w = self.canvas.winfo_width()
-        bbox = self.canvas.bbox("all")
-        world_w = bbox[2] if bbox else cv_w
+        cv_w, _, world_w = self._canvas_metrics()
         margin = cv_w * 0.2
         if x < view_left * world_w + margin:
             new_left = max(0, x - margin)
@@ -744,85 +1482,278 @@ class DAWAnnotator(tk.Tk):
             self.canvas.xview_moveto(new_left / max(1, world_w))
 
     def _compute_active_notes_at(self, t: float) -> Dict[int, int]:
-        active: Dict[int, int] = {}
-        if not (self.midi and self.midi.events):
-            return active
-        for (et, kind, note, vel) in self.midi.events:
-            if et > t:
-                break
-            if kind == 'on':
-                active[note] = max(1, int(vel))
-            elif kind == 'off':
-                active.pop(note, None)
-        return active
-
-    def _find_event_start_index(self, merged, t):
-        times = [ev[0] for ev in merged]
-        return bisect.bisect_left(times, t)
+        if not (self.midi and self.midi.n_events):
+            return {}
+        ms = self.midi
+        end = int(np.searchsorted(ms.event_times, t, side="right"))
+        # advance forward from the last answer when it is closer than the nearest checkpoint
+        cached = self._active_cache
+        cp = min(end // ACTIVE_CHECKPOINT_EVERY, len(ms.active_checkpoints) - 1)
+        start = cp * ACTIVE_CHECKPOINT_EVERY
+        if cached is not None and cached[0] is ms and start <= cached[1] <= end:
+            start, active = cached[1], dict(cached[2])
+        else:
+            active = dict(ms.active_checkpoints[cp])
+        _apply_note_events(active, ms.event_kind[start:end], ms.event_note[start:end],
+                           ms.event_vel[start:end])
+        self._active_cache = (ms, end, active)
+        return dict(active)
 
     def _redraw_all(self):
-        self.canvas.delete("all")
-        self._rect_map.clear()
-        # clear selection state on redraw (item ids will change)
-        self._clear_all_selections()
+        """Bring every lane up to date; lanes whose inputs did not change are left alone."""
+        self._last_playhead_x = None
         if self.canvas.winfo_width() <= 2:
             return
         W, H, R, P, A = self._timeline_pixels()
-        pxpb = float(self.px_per_beat.get())
-        _, bpmr = self._beats_measures()
-        total_meas = int(self.total_measures.get())
+        pxpb = self._pxpb()
+        bpm, bpmr = self._beats_measures()
+        total_meas = self._total_measures()
         total_beats = total_meas * bpmr
         virt_w = int(total_beats * pxpb) + 200
+        # scale factors for the _xt/_xm fast paths used by the lane draws below
+        self._cache_pxps = (bpm / 60.0) * pxpb
+        self._cache_ppm = bpmr * pxpb
         self.canvas.configure(scrollregion=(0, 0, virt_w, H))
+        # xview fractions are relative to the scrollregion, so this is the world width
+        self._world_w = float(virt_w)
+
+        # Only items within the padded viewport are created; lane backgrounds stay full width
+        px_lo, px_hi = self._visible_px_range(virt_w)
+        self._drawn_px = (px_lo, px_hi)
+        m_lo = self._measure_at_x(px_lo)
+        m_hi = min(total_meas, self._measure_at_x(px_hi) + 1)
+        grid = (virt_w, pxpb, bpmr, total_meas, px_lo, px_hi, m_lo, m_hi)
 
-        # Ruler
-        y0 = 0
-        self.canvas.create_rectangle(0, y0, virt_w, R, fill="#f5f5f7", width=0)
-        for m in range(1, total_meas + 1):
-            x_m = self._x_for_measure(m)
-            self.canvas.create_line(x_m, y0, x_m, R, fill="#999", width=2)
-            self.canvas.create_text(x_m + 4, y0 + 12, text=str(m), anchor="w", fill="#333", font=("TkDefault", 9, "bold"))
-            for b in range(1, int(bpmr)):
-                x_b = x_m + b * pxpb
-                self.canvas.create_line(x_b, y0 + 16, x_b, R, fill="#cfcfcf")
-
-        # Piano-roll
         y1 = R + 6
         y2 = y1 + 300
-        self.canvas.create_rectangle(0, y1, virt_w, y2, fill="#ffffff", width=0)
-        for m in range(1, total_meas + 1):
-            x_m = self._x_for_measure(m)
-            self.canvas.create_line(x_m, y1, x_m, y2, fill="#e6e6e6", width=2)
-            for b in range(1, int(bpmr)):
-                x_b = x_m + b * pxpb
-                self.canvas.create_line(x_b, y1, x_b, y2, fill="#f0f0f0")
-        if self.midi and self.midi.notes:
-            pitches = [p for _, _, p in self.midi.notes]
-            pmin, pmax = min(pitches), max(pitches)
-            span = max(1, pmax - pmin)
-            def y_for_pitch(p):
-                t = (p - pmin) / span
-                return y2 - t * (y2 - y1)
-            for s, d, p in self.midi.notes:
-                x = self._x_for_time(s)
-                w = max(1, self._x_for_time(s + d) - x)
-                y = y_for_pitch(p)
-                self.canvas.create_rectangle(x, y - 4, x + w, y + 4, fill="#7dafff", outline="")
-
-        # Annotation lane
         ya0 = y2 + 6
         ya1 = ya0 + 90
-        self.canvas.create_rectangle(0, ya0, virt_w, ya1, fill="#fbfbff", width=0)
-        for m in range(1, total_meas + 1):
-            x_m = self._x_for_measure(m)
-            self.canvas.create_line(x_m, ya0, x_m, ya1, fill="#e6e6ff")
-        if self.sel_start_measure and self.sel_end_measure:
-            s, e = sorted((self.sel_start_measure, self.sel_end_measure))
-            x0 = self._x_for_measure(s)
-            x1 = self._x_for_measure(e + 1)
-            self.canvas.create_rectangle(x0, ya0, x1, ya1, fill="#dfe8ff", outline="#7dafff")
-
-        # Instructions (tag each rect with 'ann' so hit testing works)
+        self._draw_ruler(grid, R)
+        self._draw_piano_roll(grid, bpm, y1, y2)
+        self._draw_annotations(grid, ya0, ya1)
+        self._draw_playhead(ya1)
+
+    def _schedule_redraw(self):
+        """Queue one _redraw_all for when Tk goes idle; a burst of edits/drag events shares it."""
+        if not self._redraw_pending:
+            self._redraw_pending = True
+            self.after_idle(self._flush_redraw)
+
+    def _flush_redraw(self):
+        self._redraw_pending = False
+        self._redraw_all()
+
+    def _xt(self, sec: float) -> float:
+        return sec * self._cache_pxps
+
+    def _xm(self, m: float) -> float:
+        return (m - 1) * self._cache_ppm
+
+    def _lane_stale(self, lane: str, key: tuple) -> bool:
+        """True (and the lane's items deleted) when `key` differs from the last draw.
+
+        Items tagged lane_kept (tile images, ruler labels) are left in place for their
+        owners to reuse.
+        """
+        if self._draw_cache.get(lane) == key:
+            return False
+        self._draw_cache[lane] = key
+        self.canvas.delete(f"{lane}&&!lane_kept")
+        return True
+
+    def _grid_xs(self, grid: tuple, px_lo: float) -> Tuple[np.ndarray, np.ndarray]:
+        """Measure and beat line x positions for the drawn measures, relative to px_lo."""
+        _, pxpb, bpmr, _, _, _, m_lo, m_hi = grid
+        measure_xs = (np.arange(m_lo, m_hi + 1) - 1) * self._cache_ppm - px_lo
+        beat_xs = (measure_xs[:, None] + np.arange(1, int(bpmr)) * pxpb).ravel()
+        return measure_xs, beat_xs
+
+    def _tile_grid_xs(self, grid: tuple, x0: float, x1: float) -> Tuple[np.ndarray, np.ndarray]:
+        """Measure and beat line x positions covering [x0, x1), relative to x0."""
+        _, pxpb, bpmr, total_meas = grid[:4]
+        ppm = self._cache_ppm
+        m_a = max(1, int(x0 // ppm) + 1)
+        m_b = min(total_meas, int(x1 // ppm) + 2)
+        measure_xs = (np.arange(m_a, m_b + 1) - 1) * ppm - x0
+        beat_xs = (measure_xs[:, None] + np.arange(1, int(bpmr)) * pxpb).ravel()
+        return measure_xs, beat_xs
+
+    def _put_lane_tiles(self, lane: str, key: tuple, build, px_lo: float, px_hi: float, y: float):
+        """Cover [px_lo, px_hi) of the lane with LANE_TILE_PX-wide bitmaps at height y.
+
+        build(x0, width) renders one tile as RGBA and only runs for tiles not already cached
+        under `key`. Tile items outlive _lane_stale, so a scroll only creates the images for
+        tiles coming into range and deletes those leaving it.
+        """
+        tiles, items, T = self._lane_tiles, self._tile_items, LANE_TILE_PX
+        shown = set()
+        for idx in range(int(px_lo // T), int(math.ceil(px_hi / T))):
+            tkey = (lane, key, idx)
+            photo = tiles.get(tkey)
+            if photo is None:
+                photo = ImageTk.PhotoImage(Image.fromarray(build(idx * T, T), "RGBA"), master=self.canvas)
+                tiles[tkey] = photo
+            else:
+                tiles.move_to_end(tkey)
+            shown.add(tkey)
+            if tkey not in items:
+                items[tkey] = self.canvas.create_image(idx * T, y, anchor="nw", image=photo,
+                                                       tags=(lane, "lane_kept"))
+        # tiles scrolled out of range or drawn under an older layout key
+        for tkey in [k for k in items if k[0] == lane and k not in shown]:
+            self.canvas.delete(items.pop(tkey))
+        # the lane background was just recreated on top of the kept tiles
+        self.canvas.tag_raise(f"{lane}&&lane_kept", f"{lane}&&!lane_kept")
+        # evict least recently used tiles that are not on the canvas
+        extra = len(tiles) - len(items) - LANE_TILE_SPARE
+        if extra > 0:
+            for k in [k for k in tiles if k not in items][:extra]:
+                del tiles[k]
+
+    def _draw_ruler(self, grid: tuple, R: int):
+        if not self._lane_stale("lane_ruler", grid):
+            return
+        virt_w, pxpb, bpmr, _, px_lo, px_hi, m_lo, m_hi = grid
+        tags = ("lane_ruler",)
+        y0 = 0
+        self.canvas.create_rectangle(0, y0, virt_w, R, fill="#f5f5f7", width=0, tags=tags)
+        mx, bx = self._grid_xs(grid, 0.0)
+        if HAS_PIL:
+            # all measure/beat lines in bitmap tiles instead of a create_line each
+            def build(x0, w):
+                tmx, tbx = self._tile_grid_xs(grid, x0, x0 + w)
+                return _grid_image(w, R - y0, tmx, tbx, "#f5f5f7", "#999", "#cfcfcf",
+                                   measure_w=2, beat_top=16)
+            self._put_lane_tiles("lane_ruler", grid[:4] + (R,), build, px_lo, px_hi, y0)
+        else:
+            # one polyline per line style rather than a create_line per beat
+            if len(bx):
+                self.canvas.create_line(*_grid_polyline(bx, y0 + 16, R), fill="#cfcfcf", tags=tags)
+            if len(mx):
+                self.canvas.create_line(*_grid_polyline(mx, y0, R), fill="#999", width=2, tags=tags)
+        self._sync_ruler_labels(mx.tolist(), m_lo, y0 + 12)
+
+    def _sync_ruler_labels(self, xs: List[float], m_lo: int, y: float):
+        """Measure numbers m_lo, m_lo+1, ... at xs. Label items outlive _lane_stale: a scroll
+        only creates the newly visible numbers, a zoom only moves the existing ones."""
+        cv, items = self.canvas, self._ruler_labels
+        want = {m_lo + i: x + 4 for i, x in enumerate(xs)}
+        for m in items.keys() - want.keys():
+            cv.delete(items.pop(m)[0])
+        for m, x in want.items():
+            prev = items.get(m)
+            if prev is None:
+                tid = cv.create_text(x, y, text=str(m), anchor="w", fill="#333", font=("TkDefault", 9, "bold"),
+                                     tags=("lane_ruler", "lane_kept", "ruler_label"))
+                items[m] = (tid, x)
+            elif prev[1] != x:
+                cv.coords(prev[0], x, y)
+                items[m] = (prev[0], x)
+        # over the tiles/lines the ruler redraw just stacked on top
+        cv.tag_raise("ruler_label")
+
+    def _draw_piano_roll(self, grid: tuple, bpm: float, y1: float, y2: float):
+        key = grid + (self.midi, bpm, y1, y2)
+        if not self._lane_stale("lane_roll", key):
+            return
+        virt_w, pxpb, bpmr, _, px_lo, px_hi, m_lo, m_hi = grid
+        tags = ("lane_roll",)
+        self.canvas.create_rectangle(0, y1, virt_w, y2, fill="#ffffff", width=0, tags=tags)
+        if HAS_PIL:
+            # grid and notes in bitmap tiles instead of a canvas item per note
+            h_img = int(y2 - y1)
+
+            def build(x0, w):
+                tmx, tbx = self._tile_grid_xs(grid, x0, x0 + w)
+                img = _grid_image(w, h_img, tmx, tbx, "#ffffff", "#e6e6e6", "#f0f0f0", measure_w=2)
+                xs, ws, ys = self._note_geometry(x0, x0 + w, y1, y2)
+                return _rasterize_notes(xs - x0, ws, ys - y1, w, h_img, img=img)
+            self._put_lane_tiles("lane_roll", grid[:4] + (self.midi, bpm, y1, y2), build, px_lo, px_hi, y1)
+            return
+        xs, ws, ys = self._note_geometry(px_lo, px_hi, y1, y2)
+        mx, bx = self._grid_xs(grid, 0.0)
+        if len(bx):
+            self.canvas.create_line(*_grid_polyline(bx, y1, y2), fill="#f0f0f0", tags=tags)
+        if len(mx):
+            self.canvas.create_line(*_grid_polyline(mx, y1, y2), fill="#e6e6e6", width=2, tags=tags)
+        for x, w, y in zip(xs.tolist(), ws.tolist(), ys.tolist()):
+            self.canvas.create_rectangle(x, y - 4, x + w, y + 4, fill="#7dafff", outline="", tags=tags)
+
+    def _note_geometry(self, x_lo: float, x_hi: float, y1: float, y2: float):
+        """(xs, ws, ys) canvas geometry of the notes overlapping [x_lo, x_hi)."""
+        ms = self.midi
+        if not (ms and len(ms.notes_pitch)):
+            e = np.empty(0)
+            return e, e, e
+        pmin, span, max_dur = _note_extent(ms)
+        px_per_sec = self._cache_pxps
+        t_lo = x_lo / px_per_sec - max_dur
+        i0, i1 = np.searchsorted(ms.notes_start, [t_lo, x_hi / px_per_sec], side="right")
+        # only this slice is scaled; whole-song reductions come from _note_extent
+        xs = ms.notes_start[i0:i1] * px_per_sec
+        ws = np.maximum(1.0, ms.notes_dur[i0:i1] * px_per_sec)
+        ys = y2 - (ms.notes_pitch[i0:i1].astype(np.float64) - pmin) * ((y2 - y1) / span)
+        return xs, ws, ys
+
+    def _annotation_signature(self) -> tuple:
+        """Everything the annotation lane renders from, as a comparable value."""
+        ins_sig = tuple((ins.text, ins.instruction_duration_in_measures, tuple(ins.measure_numbers))
+                        for ins in self.doc.instructions)
+        cd_sig = tuple((c.start_measure, c.count_from, getattr(c, "offset_in_ms", 0))
+                       for c in self.doc.countdowns)
+        return (ins_sig, cd_sig)
+
+    def _draw_annotations(self, grid: tuple, ya0: float, ya1: float):
+        # three sub-lanes, bottom to top: background/grid, measure selection, rects.
+        # A selection drag only touches lane_sel; a list edit leaves the grid alone.
+        layout = grid + (ya0, ya1)
+        virt_w, pxpb, _, _, px_lo, px_hi, m_lo, m_hi = grid
+        if self._lane_stale("lane_ann", layout):
+            tags = ("lane_ann",)
+            self.canvas.create_rectangle(0, ya0, virt_w, ya1, fill="#fbfbff", width=0, tags=tags)
+            if HAS_PIL:
+                def build(x0, w):
+                    tmx, _ = self._tile_grid_xs(grid, x0, x0 + w)
+                    return _grid_image(w, int(ya1 - ya0), tmx, np.empty(0), "#fbfbff", "#e6e6ff")
+                self._put_lane_tiles("lane_ann", grid[:4] + (ya0, ya1), build, px_lo, px_hi, ya0)
+            else:
+                mx = self._grid_xs(grid, 0.0)[0]
+                if len(mx):
+                    self.canvas.create_line(*_grid_polyline(mx, ya0, ya1), fill="#e6e6ff", tags=tags)
+        sel_key = layout + (self.sel_start_measure, self.sel_end_measure)
+        if self._draw_cache.get("lane_sel") != sel_key:
+            self._draw_cache["lane_sel"] = sel_key
+            band = self._sel_band
+            if self.sel_start_measure and self.sel_end_measure:
+                s, e = sorted((self.sel_start_measure, self.sel_end_measure))
+                self.canvas.coords(band, self._xm(s), ya0, self._xm(e + 1), ya1)
+                self.canvas.itemconfigure(band, state="normal")
+                self.canvas.tag_raise(band, "lane_ann")  # over a rebuilt background
+            else:
+                self.canvas.itemconfigure(band, state="hidden")
+        # items are updated in place rather than deleted, so no _lane_stale here
+        sig = self._annotation_signature()
+        key = layout + (sig,)
+        prev = self._draw_cache.get("lane_ann_items")
+        if prev != key:
+            self._draw_cache["lane_ann_items"] = key
+            # only a scroll/zoom (same annotations) keeps the selection
+            self._draw_annotation_items(pxpb, ya0, ya1, px_lo, px_hi,
+                                        keep_selection=prev is not None and prev[-1] == sig)
+
+    def _draw_annotation_items(self, pxpb: float, ya0: float, ya1: float, px_lo: float, px_hi: float,
+                               keep_selection: bool = False):
+        # rects off the padded viewport are skipped, except selected ones (so a scroll
+        # redraw can't drop them from a pending copy/cut)
+        keep = {self._rect_map[i] for i in self._selected_rects if i in self._rect_map} if keep_selection else set()
+        # clear selection state on redraw; after an edit rect meanings may have shifted,
+        # otherwise the kept rects are selected again below
+        self._clear_all_selections()
+        # _rect_map key -> (rect coords, (fill, outline), text xy, text)
+        specs: Dict[tuple, tuple] = {}
+        ppm = self._cache_ppm
+
+        # Instructions
         palette = [
             "#e69f00",  # orange-gold
             "#56b4e9",  # sky blue
@@ -832,15 +1763,18 @@ class DAWAnnotator(tk.Tk):
             "#cc79a7",  # reddish purple
         ]
         for idx, ins in enumerate(self.doc.instructions):
-            color = palette[idx % len(palette)]
-            for mstart in ins.measure_numbers:
-                x0 = self._x_for_measure(mstart)
-                x1 = self._x_for_measure(mstart + ins.instruction_duration_in_measures)
-                item_id = self.canvas.create_rectangle(x0, ya0 + 4, x1, ya1 - 4, fill=color, outline="", tags=("ann_rect", "ins", "ann"))
-                self._rect_map[item_id] = ("ins", idx, int(mstart))
-                self.canvas.create_text(x0 + 4, ya0 + 18, text=ins.text, anchor="w", fill="#eeeeee", tags=("ann_text",))
-
-        # Countdowns (also tagged 'ann')
+            color = (palette[idx % len(palette)], "")
+            mnums = np.asarray(ins.measure_numbers, dtype=np.int64)
+            x0s = (mnums - 1) * ppm
+            x1s = x0s + ins.instruction_duration_in_measures * ppm
+            vis = (x1s >= px_lo) & (x0s <= px_hi)  # same padded viewport as the other lanes
+            for key in keep:
+                if key[0] == "ins" and key[1] == idx:
+                    vis |= mnums == key[2]
+            for mstart, x0, x1 in zip(mnums[vis].tolist(), x0s[vis].tolist(), x1s[vis].tolist()):
+                specs[("ins", idx, mstart)] = ((x0, ya0 + 4, x1, ya1 - 4), color, (x0 + 4, ya0 + 18), ins.text)
+
+        # Countdowns
         for c_idx, c in enumerate(self.doc.countdowns):
             try:
                 mstart = int(c.start_measure)
@@ -848,18 +1782,67 @@ class DAWAnnotator(tk.Tk):
                 off = int(getattr(c, "offset_in_ms", 0))
             except Exception:
                 continue
-            x0 = self._x_for_measure(mstart)
+            x0 = self._xm(mstart)
             x1 = x0 + cnt_beats * pxpb
-            item_id = self.canvas.create_rectangle(x0, ya0 + 4, x1, ya1 - 4, fill="#ffcf8a", outline="#ff9f1c", tags=("ann_rect", "cd", "ann"))
-            self._rect_map[item_id] = ("cd", c_idx, None)
+            if (x1 < px_lo or x0 > px_hi) and ("cd", c_idx, None) not in keep:
+                continue
             label = f"count {int(cnt_beats)}"
             if off != 0:
                 label += f" ({off}ms)"
-            self.canvas.create_text(x0 + 6, ya0 + 18, text=label, anchor="w", fill="#7a4b00", font=("TkDefault", 9, "bold"))
-
-        # Playhead at current seek
-        xph = self._x_for_time(self._paused_elapsed)
-        self.canvas.create_line(xph, 0, xph, ya1, fill="#ff2d55", width=2, tags=("playhead",))
+            specs[("cd", c_idx, None)] = ((x0, ya0 + 4, x1, ya1 - 4), ("#ffcf8a", "#ff9f1c"), (x0 + 6, ya0 + 18), label)
+        self._sync_annotation_items(specs)
+        for key in keep:
+            if key in self._ann_items:
+                self._select_add(self._ann_items[key][0])
+
+    def _sync_annotation_items(self, specs: Dict[tuple, tuple]):
+        """Make the canvas show `specs`, reusing item ids: unchanged items cost no Tcl call,
+        moved/relabelled ones get coords/itemconfigure, only new ones are created."""
+        cv = self.canvas
+        items = self._ann_items
+        # _rect_map (rect id -> key) is kept in step with items rather than rebuilt
+        for key in items.keys() - specs.keys():
+            rid, tid, _ = items.pop(key)
+            del self._rect_map[rid]
+            cv.delete(rid, tid)
+        for key, spec in specs.items():
+            rxy, (fill, outline), txy, text = spec
+            prev = items.get(key)
+            if prev is None:
+                rect_tags, text_tags, text_opts = _ANN_ITEM_STYLE[key[0]]
+                rid = cv.create_rectangle(*rxy, fill=fill, outline=outline, tags=rect_tags)
+                tid = cv.create_text(*txy, text=text, anchor="w", tags=text_tags, **text_opts)
+                self._rect_map[rid] = key
+            else:
+                rid, tid, old = prev
+                if old != spec:
+                    if old[0] != rxy:
+                        cv.coords(rid, *rxy)
+                    if old[1] != spec[1]:
+                        cv.itemconfigure(rid, fill=fill, outline=outline)
+                    if old[2] != txy:
+                        cv.coords(tid, *txy)
+                    if old[3] != text:
+                        cv.itemconfigure(tid, text=text)
+            items[key] = (rid, tid, spec)
+        hits = sorted((x0, x1, y0, y1, key[0] == "cd", rid)
+                      for key, (rid, _, ((x0, y0, x1, y1), *_)) in items.items())
+        self._ann_hits = hits
+        self._ann_hit_x0 = [h[0] for h in hits]
+        self._ann_hit_w = max((h[1] - h[0] for h in hits), default=0.0)
+        # keep the lane over a rebuilt background, and countdowns over instructions
+        cv.tag_raise("lane_ann_items")
+        cv.tag_raise("cd")
+
+    def _draw_playhead(self, ya1: float):
+        xph = self._xt(self._paused_elapsed)
+        if self.canvas.find_withtag("playhead"):
+            self.canvas.coords("playhead", xph, 0, xph, ya1)
+        else:
+            self.canvas.create_line(xph, 0, xph, ya1, fill="#ff2d55", width=2, tags=("playhead",))
+        # lanes redrawn above may have been stacked over the overlays
+        self.canvas.tag_raise("playhead")
+        self.canvas.tag_raise("selbox")
 
 
     def _install_edit_menu_and_shortcuts(self):
@@ -881,21 +1864,20 @@ class DAWAnnotator(tk.Tk):
         except Exception:
             pass
 
-        # --- Redundant bindings on both the toplevel and the canvas ---
-        targets = [self, self.canvas]
+        # --- Bindings on the toplevel only: its tag is in every child's bindtags, so keys
+        # typed with the canvas focused reach these too ---
         copies  = ('<<Copy>>','<Command-c>','<Command-C>','<Control-c>','<Control-C>')
         cuts    = ('<<Cut>>','<Command-x>','<Command-X>','<Control-x>','<Control-X>')
         pastes  = ('<<Paste>>','<Command-v>','<Command-V>','<Control-v>','<Control-V>','<Shift-Insert>')
-        for t in targets:
-            for seq in copies:  t.bind(seq, self._kb_copy)
-            for seq in cuts:    t.bind(seq, self._kb_cut)
-            for seq in pastes:  t.bind(seq, self._kb_paste)
-            t.bind('<Delete>', self._kb_delete)
+        for seq in copies:  self.bind(seq, self._kb_copy)
+        for seq in cuts:    self.bind(seq, self._kb_cut)
+        for seq in pastes:  self.bind(seq, self._kb_paste)
+        self.bind('<Delete>', self._kb_delete)
 
-            # Undo / Redo (macOS only per request)
-            t.bind('<Command-z>', self.on_undo)
-            t.bind('<Command-Z>', self.on_undo)
-            t.bind('<Command-Shift-Z>', self.on_redo)
+        # Undo / Redo (macOS only per request)
+        self.bind('<Command-z>', self.on_undo)
+        self.bind('<Command-Z>', self.on_undo)
+        self.bind('<Command-Shift-Z>', self.on_redo)
 
         # Ensure the canvas keeps focus so key events reach it
         try:
@@ -906,12 +1888,25 @@ class DAWAnnotator(tk.Tk):
     # -------- Canvas interactions --------
 
     def _hit_test_rect(self, x: float, y: float):
-        items = self.canvas.find_overlapping(x, y, x, y)
-        for item_id in reversed(items):
-            meta = self._rect_map.get(item_id)
-            if meta:
-                return meta, item_id
-        return None
+        """(_rect_map key, rect id) of the topmost annotation rect at (x, y), or None.
+
+        Uses the sorted _ann_hits index instead of asking Tk; topmost is countdowns over
+        instructions, then the later item id, which is the canvas stacking order.
+        """
+        hits = self._ann_hits
+        lo = x - self._ann_hit_w
+        best = None
+        i = bisect.bisect_right(self._ann_hit_x0, x)
+        while i > 0:
+            i -= 1
+            x0, x1, y0, y1, is_cd, rid = hits[i]
+            if x0 < lo:
+                break
+            if x <= x1 and y0 <= y <= y1 and (best is None or (is_cd, rid) > best):
+                best = (is_cd, rid)
+        if best is None:
+            return None
+        return self._rect_map[best[1]], best[1]
 
     def on_canvas_cmd_click(self, e):
         """Toggle selection on Cmd/Ctrl-click without affecting other selections."""
@@ -938,7 +1933,7 @@ class DAWAnnotator(tk.Tk):
         self._clear_all_selections()
         self.sel_start_measure = self._measure_at_x(x)
         self.sel_end_measure = self.sel_start_measure
-        self._redraw_all()
+        self._schedule_redraw()
 
     def on_canvas_drag(self, e):
         # If any rects are selected, ignore drag (we're not dragging rects)
@@ -948,19 +1943,80 @@ class DAWAnnotator(tk.Tk):
             return
         x = self.canvas.canvasx(e.x)
         self.sel_end_measure = self._measure_at_x(x)
-        self._redraw_all()
+        self._schedule_redraw()
 
     def on_canvas_up(self, e):
         pass
 
+    def _on_canvas_configure(self, e=None):
+        # a window resize sends a burst of these; they share one idle redraw
+        if e is not None and self._cv_size == (e.width, e.height):
+            return  # moved or restacked, e.g. when pos_lbl relayouts during playback
+        self._invalidate_canvas_cache()
+        self._schedule_redraw()
+
+    def _invalidate_canvas_cache(self):
+        self._cv_size = None
+        self._last_playhead_x = None
+
+    def _canvas_metrics(self) -> Tuple[int, int, float]:
+        """(canvas width, canvas height, world width), cached between layout changes."""
+        if self._cv_size is None:
+            self._cv_size = (self.canvas.winfo_width(), self.canvas.winfo_height())
+        cv_w, cv_h = self._cv_size
+        # _world_w is set from the scrollregion by _redraw_all
+        world_w = self._world_w if self._world_w is not None else float(cv_w)
+        return cv_w, cv_h, world_w
+
+    def _on_zoom_scale(self, value=None):
+        # Scale fires per pixel of drag; redraw at most once per ~frame with the latest value.
+        # Throttled, not debounced: a steady drag still redraws every frame.
+        if value is not None:
+            self._pxpb_cache = float(value)  # the Scale passes its value; no Var read
+        if self._zoom_after is None:
+            self._zoom_after = self.after(UI_FRAME_MS, self._zoom_redraw)
+
+    def _zoom_redraw(self):
+        self._zoom_after = None
+        self._redraw_all()
+
+    def _on_xscroll(self, first, last):
+        self.hbar.set(first, last)
+        lo, hi = self._drawn_px
+        left = self.canvas.canvasx(0)
+        right = left + self.canvas.winfo_width()
+        if (left < lo or right > hi) and not self._cull_redraw_pending:
+            self._cull_redraw_pending = True
+            self.after_idle(self._redraw_for_scroll)
+
+    def _redraw_for_scroll(self):
+        # Redraw the newly visible range; _draw_annotations keeps the rectangle selection
+        self._cull_redraw_pending = False
+        self._redraw_all()
+
+    def _visible_px_range(self, virt_w: float) -> Tuple[float, float]:
+        """Visible canvas x-range padded by one viewport width on each side."""
+        cv_w = max(1, self.canvas.winfo_width())
+        left = self.canvas.canvasx(0)
+        return max(0.0, left - cv_w), min(float(virt_w), left + 2 * cv_w)
+
+    def _queue_pan(self, dx: float):
+        """Add dx to the pending pan; a burst of wheel events shares one xview_moveto."""
+        self._pending_dx += dx
+        if self._pan_after is None:
+            self._pan_after = self.after_idle(self._flush_pan)
+        return "break"
+
+    def _flush_pan(self):
+        dx, self._pending_dx, self._pan_after = self._pending_dx, 0.0, None
+        if dx:
+            self._pan_by_pixels(dx)
+
     def _pan_by_pixels(self, dx: float):
         # Pixel-precise horizontal pan using xview_moveto
         try:
-            bbox = self.canvas.bbox("all")
-            if not bbox:
-                return "break"
-            world_w = max(1, bbox[2] - bbox[0])
-            cv_w = max(1, self.canvas.winfo_width())
+            cv_w, _, world_w = self._canvas_metrics()
+            cv_w, world_w = max(1, cv_w), max(1.0, world_w)
             if world_w <= cv_w:
                 return "break"
             left_frac, right_frac = self.canvas.xview()
@@ -983,7 +2039,7 @@ class DAWAnnotator(tk.Tk):
         # Gentle speed: ~8 px per notch on Windows; small on macOS
         pixels_per_unit = 8.0
         dx = -norm * pixels_per_unit  # positive delta -> pan left
-        return self._pan_by_pixels(dx)
+        return self._queue_pan(dx)
 
         step = -1 if delta > 0 else 1
         steps = step * max(1, int(abs(delta) / 60))  # scale with magnitude for responsiveness
@@ -1002,7 +2058,7 @@ class DAWAnnotator(tk.Tk):
         norm = d / 120.0 if abs(d) >= 120 else d
         pixels_per_unit = 40.0  # page-like but not jarring
         dx = -norm * pixels_per_unit
-        return self._pan_by_pixels(dx)
+        return self._queue_pan(dx)
 
         step = -1 if delta > 0 else 1
         steps = step * max(1, int(abs(delta) / 60))
@@ -1016,7 +2072,7 @@ class DAWAnnotator(tk.Tk):
     def _on_canvas_button_wheel(self, direction):
         # X11/Linux fallback where direction = -1 (up) or +1 (down)
         pixels = 8.0 * (1 if direction > 0 else -1)
-        return self._pan_by_pixels(pixels)
+        return self._queue_pan(pixels)
 
 
 
@@ -1081,21 +2137,24 @@ class DAWAnnotator(tk.Tk):
                 text, dur, voiced, rhythmic = meta
                 key = (text, int(dur), bool(voiced), bool(rhythmic))
                 add_map.setdefault(key, []).append(mstart)
-        # Merge into existing instructions when possible
+        # Merge into existing instructions when possible; the first one with the properties wins
+        by_props: Dict[tuple, Instruction] = {}
+        for ins in self.doc.instructions:
+            key = (ins.text, ins.instruction_duration_in_measures, ins.voiced, getattr(ins, 'rhythmic', False))
+            by_props.setdefault(key, ins)
         for key, starts in add_map.items():
             starts = sorted(set(starts))
-            # find existing
-            found = None
-            for ins in self.doc.instructions:
-                if (ins.text, ins.instruction_duration_in_measures, ins.voiced, getattr(ins, 'rhythmic', False)) == key:
-                    found = ins
-                    break
+            found = by_props.get(key)
             if found is None:
                 text, dur, voiced, rhythmic = key
                 self.doc.instructions.append(Instruction(text=text, measure_numbers=starts, instruction_duration_in_measures=dur, voiced=voiced, rhythmic=rhythmic))
             else:
-                merged = sorted(set(found.measure_numbers) | set(starts))
-                found.measure_numbers = merged
+                # measure_numbers is kept sorted and unique, so insert in place
+                ms_list = found.measure_numbers
+                for m in starts:
+                    j = bisect.bisect_left(ms_list, m)
+                    if j == len(ms_list) or ms_list[j] != m:
+                        ms_list.insert(j, m)
         # Paste countdowns (use first countdown's count_from or default 8)
         if cds_to_add:
             cf = self.doc.countdowns[0].count_from if self.doc.countdowns else 8
@@ -1114,7 +2173,7 @@ class DAWAnnotator(tk.Tk):
         self._add_segments_to_doc(target, self._clipboard)
         self._clear_all_selections()
         self._refresh_lists()
-        self._redraw_all()
+        self._schedule_redraw()
         self.canvas.focus_set()
         return "break"
 
@@ -1129,28 +2188,34 @@ class DAWAnnotator(tk.Tk):
             if meta:
                 metas.append(meta)
 
-        changed = False
-        # Sort by kind so that removing instructions doesn't shift countdown indices (and vice versa)
+        # Resolve indices to objects first; deleting by index would shift the later ones
+        cds_gone = set()
+        ins_hits = []
         for (kind, idx, mstart) in metas:
             if kind == "cd" and 0 <= idx < len(self.doc.countdowns):
-                del self.doc.countdowns[idx]
+                cds_gone.add(id(self.doc.countdowns[idx]))
+            elif kind == "ins" and 0 <= idx < len(self.doc.instructions):
+                ins_hits.append((self.doc.instructions[idx], mstart))
+
+        changed = bool(cds_gone)
+        if cds_gone:
+            self.doc.countdowns[:] = [c for c in self.doc.countdowns if id(c) not in cds_gone]
+        emptied = set()
+        for ins, mstart in ins_hits:
+            ms_list = ins.measure_numbers
+            j = bisect.bisect_left(ms_list, mstart)
+            if j < len(ms_list) and ms_list[j] == mstart:
+                del ms_list[j]
                 changed = True
-        for (kind, idx, mstart) in metas:
-            if kind == "ins" and 0 <= idx < len(self.doc.instructions):
-                ins = self.doc.instructions[idx]
-                if mstart in ins.measure_numbers:
-                    ins.measure_numbers = [m for m in ins.measure_numbers if m != mstart]
-                    changed = True
-                if not ins.measure_numbers:
-                    try:
-                        self.doc.instructions.pop(idx)
-                    except Exception:
-                        pass
+            if not ms_list:
+                emptied.add(id(ins))
+        if emptied:
+            self.doc.instructions[:] = [ins for ins in self.doc.instructions if id(ins) not in emptied]
 
         if changed:
             self._clear_all_selections()
             self._refresh_lists()
-            self._redraw_all()
+            self._schedule_redraw()
         return "break"
 
     def on_canvas_seek(self, e):
@@ -1159,7 +2224,7 @@ class DAWAnnotator(tk.Tk):
         x = self.canvas.canvasx(e.x)
         t = self._time_for_x(x)
         # check playing state before stopping
-        was_playing = bool(self._audio_thread and self._audio_thread.is_alive() and not self._pause_evt.is_set())
+        was_playing = self._audio_playing() and not self._pause_evt.is_set()
         # fully stop any ongoing playback and silence synth
         self._stop_and_join_audio()
         self._set_playhead_time(t)
@@ -1192,7 +2257,7 @@ class DAWAnnotator(tk.Tk):
             rhythmic=rhythmic,
         ))
         self._refresh_lists()
-        self._redraw_all()
+        self._schedule_redraw()
 
     def on_del_instruction(self):
         idxs = list(self.ins_list.curselection())
@@ -1203,23 +2268,40 @@ class DAWAnnotator(tk.Tk):
             if 0 <= i < len(self.doc.instructions):
                 del self.doc.instructions[i]
         self._refresh_lists()
-        self._redraw_all()
+        self._schedule_redraw()
 
     def _refresh_lists(self):
-        self.ins_list.delete(0, tk.END)
+        # one variadic insert per listbox instead of a Tcl call per row
+        ins_rows = []
         for ins in self.doc.instructions:
-            tags = ["voiced" if ins.voiced else "silent"]
-            if ins.rhythmic:
-                tags.append("rhythmic")
-            meta = f"{ins.text} · {'/'.join(tags)} · {ins.instruction_duration_in_measures}m"
-            bars = ", ".join(map(str, sorted(ins.measure_numbers)))
-            self.ins_list.insert(tk.END, f"{meta} -> [{bars}]")
-        self.c_list.delete(0, tk.END)
+            tags = ("voiced" if ins.voiced else "silent") + ("/rhythmic" if ins.rhythmic else "")
+            meta = f"{ins.text} · {tags} · {ins.instruction_duration_in_measures}m"
+            bars = ", ".join(map(str, ins.measure_numbers))
+            ins_rows.append(f"{meta} -> [{bars}]")
+        cd_rows = []
         for c in self.doc.countdowns:
             if int(getattr(c, "offset_in_ms", 0)) != 0:
-                self.c_list.insert(tk.END, f"start_measure: {c.start_measure} · count_from: {c.count_from} · offset_in_ms: {c.offset_in_ms}")
+                cd_rows.append(f"start_measure: {c.start_measure} · count_from: {c.count_from} · offset_in_ms: {c.offset_in_ms}")
             else:
-                self.c_list.insert(tk.END, f"start_measure: {c.start_measure} · count_from: {c.count_from}")
+                cd_rows.append(f"start_measure: {c.start_measure} · count_from: {c.count_from}")
+        for lb, rows in ((self.ins_list, ins_rows), (self.c_list, cd_rows)):
+            # only the rows between the unchanged head and tail are replaced, in one
+            # delete and one variadic insert; the listbox's selection elsewhere survives
+            old = self._list_rows.get(str(lb), [])
+            if rows == old:
+                continue
+            n = min(len(old), len(rows))
+            head = 0
+            while head < n and old[head] == rows[head]:
+                head += 1
+            tail = 0
+            while tail < n - head and old[-1 - tail] == rows[-1 - tail]:
+                tail += 1
+            if len(old) - tail > head:
+                lb.delete(head, len(old) - tail - 1)
+            if len(rows) - tail > head:
+                lb.insert(head, *rows[head:len(rows) - tail])
+            self._list_rows[str(lb)] = rows
 
     # ======== Minimal addition: Inline edit for instruction text ========
     def _begin_ins_text_edit(self, event):
@@ -1282,7 +2364,7 @@ class DAWAnnotator(tk.Tk):
 
         # Refresh UI and canvas
         self._refresh_lists()
-        self._redraw_all()
+        self._schedule_redraw()
 
     def _cancel_ins_text_edit(self, event=None):
         if self._lb_edit_entry is not None:
@@ -1303,7 +2385,7 @@ class DAWAnnotator(tk.Tk):
             offset_in_ms=int(self.c_offset.get() or 0),
         ))
         self._refresh_lists()
-        self._redraw_all()
+        self._schedule_redraw()
 
     def on_del_countdown(self):
         idxs = list(self.c_list.curselection())
@@ -1314,7 +2396,7 @@ class DAWAnnotator(tk.Tk):
             if 0 <= i < len(self.doc.countdowns):
                 del self.doc.countdowns[i]
         self._refresh_lists()
-        self._redraw_all()
+        self._schedule_redraw()
 
     # -------- Misc keys --------
     def on_key_delete(self, event=None):
@@ -1325,7 +2407,7 @@ class DAWAnnotator(tk.Tk):
         self._clear_all_selections()
 
     def on_key_space(self, event=None):
-        if self._audio_thread and self._audio_thread.is_alive():
+        if self._audio_playing():
             self.on_pause()
         else:
             self.on_play()
@@ -1334,31 +2416,9 @@ class DAWAnnotator(tk.Tk):
     def _doc_from_yaml_dict(self, data: dict) -> AnnoDoc:
         """Build AnnoDoc from a parsed YAML dict (robust to missing keys)."""
         doc = AnnoDoc()
-        # countdowns
-        for c in data.get("countdowns", []) or []:
-            try:
-                sm = int(c.get("start_measure", 1))
-                cf = int(c.get("count_from", 4))
-                off = int(c.get("offset_in_ms", 0) or 0)
-                doc.countdowns.append(Countdown(start_measure=sm, count_from=cf, offset_in_ms=off))
-            except Exception:
-                continue
-        # instructions
-        for it in data.get("instructions", []) or []:
-            try:
-                text = str(it.get("text", "")).strip()
-                if not text:
-                    continue
-                measures = it.get("measure_numbers", [])
-                if isinstance(measures, int):
-                    measures = [measures]
-                measures = [int(m) for m in measures]
-                dur = int(it.get("instruction_duration_in_measures", 1) or 1)
-                voiced = bool(it.get("voiced", False))
-                rhythmic = bool(it.get("rhythmic", False))
-                doc.instructions.append(Instruction(text=text, measure_numbers=measures, instruction_duration_in_measures=dur, voiced=voiced, rhythmic=rhythmic))
-            except Exception:
-                continue
+        doc.countdowns = _build_all(_countdown_from_yaml, data.get("countdowns", []) or [])
+        built = _build_all(_instruction_from_yaml, data.get("instructions", []) or [])
+        doc.instructions = [ins for ins in built if ins is not None]
         return doc
 
     def on_load_yaml(self):
@@ -1366,8 +2426,12 @@ class DAWAnnotator(tk.Tk):
         if not path:
             return
         try:
-            with open(path, "r", encoding="utf-8") as f:
-                data = yaml.safe_load(f) or {}
+            with open(path, "rb") as f:
+                if os.fstat(f.fileno()).st_size == 0:  # mmap refuses empty files
+                    data = {}
+                else:
+                    with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                        data = yaml.load(mm, Loader=YamlLoader) or {}
             new_doc = self._doc_from_yaml_dict(data)
         except Exception as e:
             messagebox.showerror("YAML", f"Failed to load YAML: {e}")
@@ -1381,17 +2445,14 @@ class DAWAnnotator(tk.Tk):
         self._refresh_lists()
 
         # Heuristic: update total_measures to at least cover the latest annotation
-        max_bar = 0
-        for ins in self.doc.instructions:
-            end_bars = [m + ins.instruction_duration_in_measures - 1 for m in ins.measure_numbers]
-            max_bar = max(max_bar, *(end_bars or [0]))
-        for c in self.doc.countdowns:
-            max_bar = max(max_bar, c.start_measure)
+        max_bar = max((m + ins.instruction_duration_in_measures - 1
+                       for ins in self.doc.instructions for m in ins.measure_numbers), default=0)
+        max_bar = max(max_bar, max((c.start_measure for c in self.doc.countdowns), default=0))
         if max_bar > 0:
             self.total_measures.set(max(max_bar + 4, int(self.total_measures.get())))
 
         # Redraw canvas so rectangles appear
-        self._redraw_all()
+        self._schedule_redraw()
         messagebox.showinfo("YAML", f"Loaded annotations from\n{path}")
         self._save_undo_checkpoint("post_load_yaml")
 
@@ -1400,20 +2461,21 @@ class DAWAnnotator(tk.Tk):
         if not path:
             return
         try:
-            ms = MidiSummary.from_file(path)
+            ms = _load_cached(path)
         except Exception as e:
             messagebox.showerror("MIDI", f"Failed to load MIDI: {e}")
             return
         self.midi = ms
         self.midi_path = path
-        self.midi_lbl.config(text=os.path.basename(path))
+        self.midi_lbl.config(text=_file_label(path)[0])
         self.bpm.set(round(ms.bpm))
         self.ts_num.set(ms.time_sig[0])
         self.ts_den.set(ms.time_sig[1])
         beats_per_measure = (4 / ms.time_sig[1]) * ms.time_sig[0]
         total_measures = max(1, int(math.ceil((ms.duration_sec * (ms.bpm / 60.0)) / beats_per_measure)))
         self.total_measures.set(max(total_measures, 32))
-        print(f"[MIDI] events={len(ms.events)} tempo_changes={len(ms.tempo_changes)} duration={ms.duration_sec:.3f}s", flush=True)
+        log.info("[MIDI] events=%d tempo_changes=%d duration=%.3fs",
+                 ms.n_events, len(ms.tempo_changes), ms.duration_sec)
         self._redraw_all()
         self._save_undo_checkpoint("load_midi")
 
@@ -1422,53 +2484,61 @@ class DAWAnnotator(tk.Tk):
         if not path:
             return
         self.sf2_path = path
-        self.sf2_lbl.config(text=os.path.basename(path))
-        # Recreate shared synth on new sf2
-        if self._fs_shared:
+        self.sf2_lbl.config(text=_file_label(path)[0])
+        # Recreate shared synth on new sf2 (loads in the background)
+        self._stop_and_join_audio()
+        with self._fs_lock:
+            old, self._fs_shared = self._fs_shared, None
+        if old:
             try:
-                self._fs_shared.stop()
+                old.stop()
             except Exception:
                 pass
-            self._fs_shared = None
+        self._sf2_failed = None
         self._ensure_synth()
 
     def on_export_yaml(self):
-        text = self.doc.to_yaml()
-        name = os.path.splitext(os.path.basename(self.midi_path or "annotations"))[0]
+        name = _file_label(self.midi_path or "annotations")[1]
         out = filedialog.asksaveasfilename(defaultextension=".yaml", initialfile=f"{name}.yaml", filetypes=[("YAML", "*.yaml")])
         if not out:
             return
         with open(out, "w", encoding="utf-8") as f:
-            f.write(text)
+            self.doc.to_yaml(f)
         messagebox.showinfo("Export", f"Saved to\n{out}")
 
     # -------- Playback --------
     def measure_len_sec(self) -> float:
-        bpm = float(self.bpm.get())
-        tsn, tsd = int(self.ts_num.get()), int(self.ts_den.get())
-        beats_per_measure = (4 / tsd) * tsn
-        return (60.0 / bpm) * beats_per_measure
+        return self._tempo()[2]
 
     def on_play(self):
         # stop/join any previous playback and silence synth
         self._stop_and_join_audio()
         self._cancel_ui_loop()
-        if self.midi and self.midi.events:
-            self._play_length_sec = max(t for t, *_ in self.midi.events) + 1.0
+        if self.midi and self.midi.n_events:
+            self._play_length_sec = float(self.midi.event_times[-1]) + 1.0
         else:
-            self._play_length_sec = self.measure_len_sec() * int(self.total_measures.get())
+            self._play_length_sec = self.measure_len_sec() * self._total_measures()
+        bpm, bpmr = self._beats_measures()
+        self._audio_state = types.SimpleNamespace(bpm=bpm, beats_per_measure=bpmr,
+                                                  metronome=bool(self.metronome_on.get()))
+        self._audio_cmd_q = queue.SimpleQueue()
+        fs = self._ensure_synth()  # may start an sf2 load, which updates widgets
         self._start_t = time.perf_counter()
         self._pause_evt.clear()
-        self._audio_thread = threading.Thread(target=self._audio_loop, daemon=True)
-        self._audio_thread.start()
-        self._ui_after = self.after(33, self._ui_loop)
+        with self._audio_lock:
+            self._audio_queued = self._audio_gen
+            self._audio_idle.clear()
+        self._audio_jobs.put((self._audio_gen, fs))
+        self._next_frame_t = time.perf_counter()
+        self._schedule_ui_frame()
 
     def on_pause(self):
-        if not self._audio_thread:
+        if not self._audio_playing():
             return
         if not self._pause_evt.is_set():
             self._paused_elapsed += time.perf_counter() - self._start_t
             self._pause_evt.set()
+            self._wake_evt.set()
         else:
             self.on_play()
 
@@ -1489,84 +2559,244 @@ class DAWAnnotator(tk.Tk):
     def _ui_loop(self):
         # We are executing a scheduled tick; clear stored handle
         self._ui_after = None
-        if self._stop_evt.is_set():
-            return
+        # no stop check: stopping cancels this loop, and _stop_evt can still be set
+        # for a previous job that is winding down
         if self._pause_evt.is_set():
-            self._ui_after = self.after(33, self._ui_loop)
+            self._schedule_ui_frame()
             return
         elapsed = (time.perf_counter() - self._start_t) + self._paused_elapsed
         if elapsed >= self._play_length_sec:
             return
         self._playhead_sec = elapsed
         x = self._x_for_time(elapsed)
-        H = self.canvas.winfo_height()
-        self.canvas.coords("playhead", x, 0, x, H)
-        view_left, view_right = self.canvas.xview()
-        cv_w = self.canvas.winfo_width()
-        bbox = self.canvas.bbox("all")
-        world_w = bbox[2] if bbox else cv_w
-        margin = cv_w * 0.2
-        if x > (view_right * world_w) - margin:
-            new_left = min(x - margin, max(0, world_w - cv_w))
-            self.canvas.xview_moveto(max(0, new_left / max(1, world_w)))
+        # Tk work only when the playhead lands on a new pixel
+        if int(x) != self._last_playhead_x:
+            self._last_playhead_x = int(x)
+            cv_w, H, world_w = self._canvas_metrics()
+            self.canvas.coords("playhead", x, 0, x, H)
+            view_left, view_right = self.canvas.xview()
+            margin = cv_w * 0.2
+            if x > (view_right * world_w) - margin:
+                new_left = min(x - margin, max(0, world_w - cv_w))
+                self.canvas.xview_moveto(max(0, new_left / max(1, world_w)))
         mlen = self.measure_len_sec()
         m_now = int(elapsed / max(1e-9, mlen)) + 1
-        self.pos_lbl.config(text=f"t={elapsed:.2f}s · m={m_now}")
-        self._ui_after = self.after(33, self._ui_loop)
+        text = f"t={elapsed:.2f}s · m={m_now}"
+        if text != self._last_pos_text:
+            self._last_pos_text = text
+            self.pos_lbl.config(text=text)
+        self._schedule_ui_frame()
+
+    def _schedule_ui_frame(self):
+        """Queue the next tick on a fixed UI_FRAME_MS deadline grid, so a slow tick doesn't
+        push every later frame back; after a longer stall the missed frames are dropped."""
+        period = UI_FRAME_MS / 1000.0
+        now = time.perf_counter()
+        self._next_frame_t += period
+        if now - self._next_frame_t > period:
+            self._next_frame_t = now
+        delay_ms = int((self._next_frame_t - now) * 1000)
+        if delay_ms <= 0:
+            self._ui_after = self.after_idle(self._ui_loop)
+        else:
+            self._ui_after = self.after(delay_ms, self._ui_loop)
+
+    def _audio_worker(self):
+        while True:
+            job = self._audio_jobs.get()
+            if job is _AUDIO_SHUTDOWN:
+                return
+            gen, fs = job
+            with self._audio_lock:
+                current = gen == self._audio_gen  # not stopped since it was queued
+                if current:
+                    self._stop_evt.clear()
+            try:
+                if current:
+                    self._audio_loop(fs)
+            except Exception:
+                log.exception("[audio] playback stopped")
+            finally:
+                with self._audio_lock:
+                    if gen == self._audio_queued:  # no newer job waiting
+                        self._audio_idle.set()
 
-    def _audio_loop(self):
-        merged: List[Tuple[float, str, int, int, int]] = []
-        if self.midi and self.midi.events:
-            merged.extend([(t, k, n, v, 0) for (t, k, n, v) in self.midi.events])
-        end_time = self._play_length_sec
-        if self.metronome_on.get() and self.midi:
-            tsn, tsd = int(self.ts_num.get()), int(self.ts_den.get())
-            bpmr = (4 / tsd) * tsn
-            if self.midi.tempo_changes:
-                tchanges = self.midi.tempo_changes
-            else:
-                uspb = int(60_000_000 / max(1, int(self.bpm.get())))
-                tchanges = [(0.0, uspb)]
-            clicks = build_click_events(tchanges, end_time, bpmr)
-            merged.extend(clicks)
-        merged.sort(key=lambda x: x[0])
+    def _audio_loop(self, fs: Optional[FluidPlayer]):
+        merged = self._merged_play_events()
+        merged_times = merged['t']
 
-        fs = self._ensure_synth()
         start_elapsed = self._paused_elapsed
-        i = self._find_event_start_index(merged, start_elapsed)
+        i = int(np.searchsorted(merged_times, start_elapsed, side="left"))
+        self._nps.reset()
 
         # Prime sustained notes at seek time
-        if fs and self.midi and self.midi.events:
+        if fs and self.midi and self.midi.n_events:
             fs.all_notes_off()  # extra safety
             active = self._compute_active_notes_at(start_elapsed)
             for note, vel in active.items():
                 fs.note_on(note, vel, 0)
 
-        start = time.perf_counter()
+        # One clock for audio and playhead: restart it now that setup (merge/sort/prime)
+        # is done, so the UI does not run ahead of the sound by that setup time
+        self._start_t = time.perf_counter()
+        if fs and fs.pcm:
+            self._pcm_loop(fs, merged, merged_times, i, start_elapsed)
+            return
+        if fs and fs.seq is not None:
+            self._seq_loop(fs, merged, merged_times, i, start_elapsed)
+            return
+
+        start = self._start_t
         try:
             while not self._stop_evt.is_set():
+                self._drain_audio_cmds()
                 if self._pause_evt.is_set():
-                    time.sleep(0.005)
+                    self._wait_wake()
                     continue
                 elapsed = (time.perf_counter() - start) + start_elapsed
                 if elapsed >= self._play_length_sec:
                     break
-                while i < len(merged) and merged[i][0] <= elapsed:
-                    _, kind, note, vel, ch = merged[i]
-                    if fs:
-                        if kind in ('on', 'click_on'):
-                            fs.note_on(note, max(1, vel), ch)
-                        elif kind in ('off', 'click_off'):
-                            fs.note_off(note, ch)
-                    i += 1
-                next_due = merged[i][0] - elapsed if i < len(merged) else 0.02
-                time.sleep(max(0.001, min(0.02, next_due)))
+                due = int(np.searchsorted(merged_times, elapsed, side="right"))
+                if fs and due > i:
+                    fs.send(self._admitted(merged[i:due].tolist()))
+                i = max(i, due)
+                next_due = merged_times[i] - elapsed if i < len(merged) else 0.05
+                self._wait_wake(min(next_due, 0.05))
         finally:
             # do not delete synth; just silence to avoid overlaps
             self._all_notes_off()
 
+    def _wait_wake(self, timeout: Optional[float] = None):
+        """Sleep until `timeout` elapses or a pause/stop/seek sets _wake_evt (None: no timeout)."""
+        if self._wake_evt.wait(None if timeout is None else max(0.0, timeout)):
+            self._wake_evt.clear()
+
+    def _merged_play_events(self) -> np.ndarray:
+        """MIDI events and metronome clicks as one time-sorted PLAY_EVENT_DTYPE array.
+
+        Reused across plays (pause/resume, seeks) until the MIDI, tempo, meter or play
+        length changes.
+        """
+        ms = self.midi
+        if ms is None:
+            return np.zeros(0, dtype=PLAY_EVENT_DTYPE)
+        st = self._audio_state
+        end_time = self._play_length_sec
+        if ms.tempo_changes:
+            tchanges = ms.tempo_changes
+        else:
+            tchanges = [(0.0, int(60_000_000 / max(1, int(st.bpm))))]
+        key = (ms, tuple(tchanges), end_time, st.beats_per_measure)
+        cached = self._merged_cache
+        if cached is not None and cached[0] == key:
+            return cached[1]
+        parts = [ms.play_events()] if ms.n_events else []
+        # clicks are always merged; _admitted gates them so the toggle works mid-play
+        parts.append(build_click_play_events(tchanges, end_time, st.beats_per_measure))
+        merged = np.concatenate(parts)
+        # stable: on ties notes stay ahead of clicks and each on ahead of its off
+        merged = merged[np.argsort(merged['t'], kind="stable")]
+        self._merged_cache = (key, merged)
+        return merged
+
+    def _drain_audio_cmds(self):
+        q, st = self._audio_cmd_q, self._audio_state
+        while True:
+            try:
+                st.__dict__.update(q.get_nowait())
+            except queue.Empty:
+                return
+
+    def _admitted(self, events: List[PlayEvent]) -> List[PlayEvent]:
+        """The events to actually play: muted clicks and NpsLimiter drops removed."""
+        admit = self._nps.admit
+        if self._audio_state.metronome:
+            return [ev for ev in events if admit(ev)]
+        return [ev for ev in events if ev[1] != EV_CLICK_ON and admit(ev)]
+
+    def _seq_loop(self, fs: FluidPlayer, merged: np.ndarray,
+                  merged_times: np.ndarray, i: int, start_elapsed: float):
+        """Keep SEQ_LOOKAHEAD_SEC of events queued on the FluidSynth sequencer.
+
+        FluidSynth plays each event at its tick, so this thread only wakes a few
+        times per look-ahead window to top the queue up.
+        """
+        start = self._start_t
+        base_tick = fs.seq_tick() + SEQ_LATENCY_MS
+        flushed = False
+        try:
+            while not self._stop_evt.is_set():
+                self._drain_audio_cmds()
+                if self._pause_evt.is_set():
+                    if not flushed:
+                        # already-queued notes would keep sounding through the pause
+                        fs.clear_scheduled()
+                        fs.all_notes_off()
+                        flushed = True
+                    self._wait_wake()
+                    continue
+                elapsed = (time.perf_counter() - start) + start_elapsed
+                horizon = elapsed + SEQ_LOOKAHEAD_SEC
+                due = int(np.searchsorted(merged_times, horizon, side="right"))
+                if due > i:
+                    fs.schedule(self._admitted(merged[i:due].tolist()), base_tick, start_elapsed)
+                i = max(i, due)
+                if elapsed >= self._play_length_sec:
+                    break
+                self._wait_wake(SEQ_LOOKAHEAD_SEC / 4)
+        finally:
+            fs.clear_scheduled()
+            self._all_notes_off()
+
+    def _pcm_loop(self, fs: FluidPlayer, merged: np.ndarray,
+                  merged_times: np.ndarray, i: int, start_elapsed: float):
+        """Render fixed-size blocks ahead of the device into fs.out's bounded queue.
+
+        Events are dispatched at their sample offset inside each block, so timing no
+        longer depends on how promptly this thread wakes up; the device callback paces it.
+        """
+        out = fs.out
+        sr = float(fs.sample_rate)
+        block = out.block_frames
+        pos = start_elapsed  # timeline position of the next block's first frame
+        try:
+            while not self._stop_evt.is_set():
+                self._drain_audio_cmds()
+                if self._pause_evt.is_set():
+                    out.flush()
+                    self._wait_wake()
+                    continue
+                if pos >= self._play_length_sec:
+                    break
+                block_end = pos + block / sr
+                parts = []
+                done = 0
+                j = int(np.searchsorted(merged_times, block_end, side="left"))
+                if j > i:
+                    # events sharing a sample offset (chords, note+click) go out as one batch
+                    evs = merged[i:j].tolist()
+                    offs = np.clip(((merged_times[i:j] - pos) * sr).astype(np.int64), 0, block)
+                    cuts = (np.flatnonzero(np.diff(offs)) + 1).tolist()
+                    for a, b in zip([0] + cuts, cuts + [len(evs)]):
+                        off = int(offs[a])
+                        if off > done:
+                            parts.append(fs.get_samples(off - done))
+                            done = off
+                        fs.send(self._admitted(evs[a:b]))
+                    i = j
+                if done < block:
+                    parts.append(fs.get_samples(block - done))
+                buf = parts[0] if len(parts) == 1 else np.concatenate(parts)
+                if not out.put(buf.tobytes(), self._stop_evt):
+                    break
+                pos = block_end
+        finally:
+            out.flush()
+            self._all_notes_off()
+
 # ======================= main =======================
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
     app = DAWAnnotator()
     try:
         style = ttk.Style(app)
@@ -4,12 +4,18 @@ import sys
 from utils import *
 import time
 
+# at most this many min/max pairs are plotted; more points than pixels only slows plt.plot
+MAX_PLOT_BINS = 4000
+
 def plot_wave(filename):
     # Load the MP3 file
     audio = load_audio(filename)
 
-    # Convert the audio segment to raw data
-    signal = np.array(audio.get_array_of_samples())
+    # View the raw data as samples without copying (24-bit audio goes through pydub)
+    if audio.sample_width in (1, 2, 4):
+        signal = np.frombuffer(audio.raw_data, dtype=f"<i{audio.sample_width}")
+    else:
+        signal = np.array(audio.get_array_of_samples())
 
     # Get the frame rate
     fs = audio.frame_rate
@@ -17,11 +23,16 @@ def plot_wave(filename):
     # If the audio has 2 channels (stereo), convert to mono by averaging the channels
     if audio.channels == 2:
         print("the loaded file is stereo")
-        signal = signal.reshape((-1, 2))
-        signal = signal.mean(axis=1)
-
-    # Create a time axis in seconds
-    Time = np.linspace(0, len(signal) / fs, num=len(signal))
+        signal = signal.reshape((-1, 2)).sum(axis=1, dtype=np.int64) // 2
+
+    # Min/max envelope per bin keeps the peaks of the full-rate signal
+    step = max(1, len(signal) // MAX_PLOT_BINS)
+    if step > 1:
+        blocks = signal[:len(signal) // step * step].reshape((-1, step))
+        signal = np.column_stack((blocks.min(axis=1), blocks.max(axis=1))).ravel()
+        Time = np.repeat(np.arange(len(blocks)) * (step / fs), 2)
+    else:
+        Time = np.arange(len(signal)) / fs
 
     # Plot the waveform
     plt.figure(1)
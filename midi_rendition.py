@@ -1,153 +1,216 @@
 from midi2audio import FluidSynth
-from pydub import AudioSegment
+import ffmpeg
+import functools
+import hashlib
+import itertools
 import os
 import mido
 import tempfile
+import shutil
+from concurrent.futures import ProcessPoolExecutor
+
+def _examine_midi(mid, label):
+    print("Examining:", label)
+    for k,track in enumerate(mid.tracks):
+        current_tick = 0
+        print("track:",k)
+        for msg in track:
+            current_tick += msg.time
+            #print(msg)
+            if "note" not in msg.type:
+                print(current_tick, msg)
 
 def examine_midi_msg(midi_file):
     """
     look at non-note msgs
     """
-    print("Examining:", midi_file)
     with mido.MidiFile(midi_file) as mid:
-        for k,track in enumerate(mid.tracks):
-            current_tick = 0
-            print("track:",k)
-            for msg in track:
-                current_tick += msg.time
-                #print(msg)
-                if "note" not in msg.type:
-                    print(current_tick, msg)
+        _examine_midi(mid, midi_file)
+
+# ffmpeg output options of wav_to_mp3, also part of the render cache key
+MP3_OUTPUT_OPTIONS = {"format": "mp3", "acodec": "libmp3lame"}
+# number of renders kept in music/.cache, the least recently used ones are removed beyond that
+RENDER_CACHE_SIZE = 64
+
+def wav_to_mp3(wav_file, mp3_file):
+    """
+    encode a wav file to mp3 with ffmpeg directly, without decoding it into python first
+    """
+    ffmpeg.input(wav_file).output(mp3_file, **MP3_OUTPUT_OPTIONS).overwrite_output().run(quiet=True)
+
+def _render_cache_key(midi_file, soundfont):
+    """
+    hash of everything the rendered mp3 depends on: the midi content, the soundfont (path and mtime) and the mp3 encoder options
+    """
+    h = hashlib.blake2b(digest_size=16)
+    with open(midi_file, "rb") as f:
+        h.update(f.read())
+    soundfont = os.path.expanduser(str(soundfont))
+    h.update(f"{soundfont}:{os.path.getmtime(soundfont) if os.path.exists(soundfont) else None}".encode())
+    h.update(repr(sorted(MP3_OUTPUT_OPTIONS.items())).encode())
+    return h.hexdigest()
+
+def _prune_render_cache(cache_dir, keep=RENDER_CACHE_SIZE):
+    """
+    remove all but the `keep` most recently used renders from cache_dir
+    """
+    renders = [os.path.join(cache_dir, name) for name in os.listdir(cache_dir) if name.endswith(".mp3")]
+    renders.sort(key=os.path.getmtime, reverse=True)
+    for path in renders[keep:]:
+        os.remove(path)
 
 def generate_mp3_simple(midi_file, soundfont):
     """
     render midi from ./midi folder and save the mp3 file to ./music folder
+    renders are kept in ./music/.cache (the RENDER_CACHE_SIZE most recently used), an unchanged midi/soundfont pair is copied from there instead of re-rendered
     """
     mp3_file = f"{midi_file.replace('/midi/', '/music/')[:-4]}.mp3"
+    cache_dir = os.path.join(os.path.dirname(mp3_file), ".cache")
+    cached_mp3 = os.path.join(cache_dir, f"{_render_cache_key(midi_file, soundfont)}.mp3")
+    if os.path.exists(cached_mp3):
+        print(f"reusing cached render: {cached_mp3}")
+        shutil.copyfile(cached_mp3, mp3_file)
+        # mark as recently used for _prune_render_cache
+        os.utime(cached_mp3)
+        return
 
     fluidsynth = FluidSynth(soundfont)
     # render in wav
     wav_filename = f"{midi_file[:-4]}.wav"
     fluidsynth.midi_to_audio(midi_file, wav_filename)
     # convert to mp3
-    audio = AudioSegment.from_wav(wav_filename)
-    audio.export(mp3_file, format="mp3")
+    wav_to_mp3(wav_filename, mp3_file)
     # delete wav
     if os.path.exists(wav_filename):
         os.remove(wav_filename)
         print(f"Deleted intermediate WAV file: {wav_filename}")
+    os.makedirs(cache_dir, exist_ok=True)
+    # copy under a temp name and rename, so an interrupted copy never looks like a cached render
+    fd, tmp = tempfile.mkstemp(suffix=".tmp", dir=cache_dir)
+    os.close(fd)
+    try:
+        shutil.copyfile(mp3_file, tmp)
+        os.replace(tmp, cached_mp3)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+    _prune_render_cache(cache_dir)
+
+def _trim_logic_midi(mid):
+    # to know whether it's a midi file in which the global controls are seperated from other midi events (as exported by logic)
+    no_note_track_status = [not any("note_on" in msg.type for msg in track) for track in mid.tracks]
+    print("does the track have notes?",no_note_track_status)
+    if not any(no_note_track_status):
+        return mid
+
+    #it's a logic midi file which might have timing issue in need of adjustment
+    real_length_in_tick = sum(msg.time for msg in mid.tracks[-1])
+    print("real_length_in_tick",real_length_in_tick)
+    track = mid.tracks[0]
+    # keep the msgs within the real length, plus the first one past it pulled back to the end
+    for i, current_tick in enumerate(itertools.accumulate(msg.time for msg in track)):
+        if current_tick>real_length_in_tick:
+            track[i] = track[i].copy(time=track[i].time-(current_tick-real_length_in_tick))
+            del track[i+1:]
+            break
+    return mid
 
 def trim_logic_midi(midi_file):
     """
     to ensure there is no logic gotchas (appears to be normal when open in logic, but has hidden events that cause the rendered audio to be super long)
     """
-    clist = []
-    no_note_track_status = []
     with mido.MidiFile(midi_file) as mid:
-        for track_index, track in enumerate(mid.tracks):
-            # to know whether it's a midi file in which the global controls are seperated from other midi events (as exported by logic)
-            no_note_track = True
-            current_tick = 0
-            note_tick = 0
-            for msg in track:
-                current_tick += msg.time
-                if "note_on" in msg.type:
-                    note_tick+=msg.time
-                    no_note_track = False
-            print(track_index, "TICKS",current_tick, note_tick)
-            clist.append(current_tick)
-            no_note_track_status.append(no_note_track)
-        real_length_in_tick = clist[-1]
-        print("real_length_in_tick",real_length_in_tick)
-        print("does the track have notes?",no_note_track_status)
-
-        #it's a logic midi file which might have timing issue in need of adjustment
-        if True in no_note_track_status:
-            trimmed_no_note_track = mido.MidiTrack()
-            current_tick = 0
-            for msg in mid.tracks[0]:
-                current_tick+=msg.time
-                # append the msg if it's within the real length
-                if current_tick<=real_length_in_tick:
-                    trimmed_no_note_track.append(msg)
-                else:
-                    new_msg = msg.copy(time=msg.time-(current_tick-real_length_in_tick))
-                    trimmed_no_note_track.append(new_msg)
-                    break
-            del mid.tracks[0]
-            mid.tracks.insert(0,trimmed_no_note_track)
-        return mid
+        return _trim_logic_midi(mid)
 
-def midi_adjust_tempo(midi_file, bpm = 100):
+def _adjust_tempo(mid, bpm):
     print("ADJUST TEMPO")
-    mid = trim_logic_midi(midi_file)
-    #mid = mido.MidiFile(midi_file)
+    _trim_logic_midi(mid)
 
     print("number of tracks:",len(mid.tracks))
     #Tempo is in microseconds per beat (quarter note) default: 500000  (60 bpm)
-    new_mid = mido.MidiFile()
-    for track_index, track in enumerate(mid.tracks):
-        new_track = mido.MidiTrack()
-        # add the new track to the new midi file
-        new_mid.tracks.append(new_track)
-
-        new_mid.ticks_per_beat=mid.ticks_per_beat
-        print("tempo:",mido.bpm2tempo(bpm))
+    tempo = mido.bpm2tempo(bpm)
+    print("tempo:",tempo)
+    # rewrite the set_tempo msgs in place, only they need new objects
+    for track in mid.tracks:
+        for i, msg in enumerate(track):
+            if msg.type == 'set_tempo':
+                track[i] = msg.copy(tempo=tempo)
         # set tempo at the beginning
-        new_track.append(mido.MetaMessage('set_tempo', tempo=mido.bpm2tempo(bpm), time=0))
+        track.insert(0, mido.MetaMessage('set_tempo', tempo=tempo, time=0))
+    # saved as a fresh mido.MidiFile() with the source ticks per beat would be
+    mid.type = 1
+    return mid
+
+def midi_adjust_tempo(midi_file, bpm = 100):
+    # _adjust_tempo does the logic trim itself
+    with mido.MidiFile(midi_file) as mid:
+        _adjust_tempo(mid, bpm)
+        adjusted_midi_file = f"{os.path.splitext(midi_file)[0]}_{bpm}.mid"
+        mid.save(adjusted_midi_file)
+        return adjusted_midi_file
 
+def _adjust_inst(mid, inst):
+    print("ADJUST INSTRUMENT")
+    inst = insts[inst]
+
+    print("number of tracks:",len(mid.tracks))
+    for track_index, track in enumerate(mid.tracks):
+        notes_channel = 0
+        new_msgs = []
         for msg in track:
-            if msg.type == 'set_tempo':
-                new_msg = mido.MetaMessage('set_tempo', tempo=mido.bpm2tempo(bpm), time=msg.time)
-                new_track.append(new_msg)
+            msg_type = msg.type
+            if msg_type == "note_on":
+                notes_channel = msg.channel
+            if msg_type in ("instrument_name", "channel_prefix"):
+                continue
+            elif msg_type == 'program_change':
+                print(track_index, "program_change", msg)
+                new_msgs.append(mido.Message('program_change', program=inst, channel=msg.channel, time=msg.time))
             else:
-                new_track.append(msg)
-
-    adjusted_midi_file = f"{os.path.splitext(midi_file)[0]}_{bpm}.mid"
-    new_mid.save(adjusted_midi_file)
-    return adjusted_midi_file
+                new_msgs.append(msg)
+        # handle default situation
+        track[:] = [mido.Message('program_change', program=inst, time=0, channel = notes_channel)] + new_msgs
+    # saved as a fresh mido.MidiFile() with the source ticks per beat would be
+    mid.type = 1
+    return mid
 
 def midi_adjust_inst(midi_file, soundfont = None, inst = "nylon-guitar"):
     """
     modify midi given bpm
     assumes single instrument
     """
-
-    print("ADJUST INSTRUMENT")
-    inst = insts[inst]
-
     with mido.MidiFile(midi_file) as mid:
-        print("number of tracks:",len(mid.tracks))
-        #Tempo is in microseconds per beat (quarter note) default: 500000  (60 bpm)
-
-        new_mid = mido.MidiFile()
-        for track_index, track in enumerate(mid.tracks):
-            new_track = mido.MidiTrack()
-            # add the new track to the new midi file
-            new_mid.tracks.append(new_track)
-            notes_channel = 0
-            new_mid.ticks_per_beat=mid.ticks_per_beat
-
-            for msg in track:
-                if msg.type == "note_on":
-                    notes_channel = msg.channel
-                if msg.type == "instrument_name":
-                    continue
-                if msg.type == "channel_prefix":
-                    continue
-                elif msg.type == 'program_change':
-                    print(track_index, "program_change", msg)
-                    new_msg = mido.Message('program_change', program=inst, channel=msg.channel, time=msg.time)
-                    new_track.append(new_msg)
-                else:
-                    new_track.append(msg)
-            # handle default situation
-            new_track.insert(0,mido.Message('program_change', program=inst, time=0, channel = notes_channel))
-
+        _adjust_inst(mid, inst)
         adjusted_midi_file = midi_file
-        new_mid.save(adjusted_midi_file)
+        mid.save(adjusted_midi_file)
         return adjusted_midi_file
 
+def _add_padding_at_start(mid, num_measures, numerator, denominator):
+    print("number of tracks:",len(mid.tracks))
+    for track in mid.tracks:
+        first_time_signature_index = 0
+        index = 0
+        # find the starting of the track
+        for msg in track:
+            if msg.type == 'time_signature':
+                print(msg)
+                first_time_signature_index = index
+                print("midi_add_padding_at_start", "track numerator", msg.numerator,"track denominator", msg.denominator)
+                track_numerator = msg.numerator
+                track_denominator = msg.denominator
+                break
+            index+=1
+        print("padding insert position (index of midi msg):", first_time_signature_index+1)
+        # must use 4 instead of track_denominator. due to midi weirdness
+        ticks_per_measure = int (numerator * mid.ticks_per_beat * 4 / denominator)
+        total_ticks = num_measures * ticks_per_measure
+
+        padding_note = mido.Message("note_off", time = total_ticks)
+        #time_sig_msg = mido.MetaMessage('time_signature',numerator=track_numerator, denominator=track_denominator,time=0)
+        #track.insert(0, time_sig_msg)
+        track.insert(first_time_signature_index+1, padding_note)
+    return mid
+
 def midi_add_padding_at_start(midi_file, num_measures = 6, numerator = 2, denominator = 4):
     """
     pad the beginning of the midi so that you could add synchronization instructions there
@@ -155,117 +218,110 @@ def midi_add_padding_at_start(midi_file, num_measures = 6, numerator = 2, denomi
     """
     print(f"ADD PADDING: {midi_file}, num padded measures {num_measures} numerator {numerator} denominator {denominator}")
     with mido.MidiFile(midi_file) as mid:
-        print("number of tracks:",len(mid.tracks))
-        for track in mid.tracks:
-            first_time_signature_index = 0
-            index = 0
-            # find the starting of the track
-            for msg in track:
-                if msg.type == 'time_signature':
-                    print(msg)
-                    first_time_signature_index = index
-                    print("midi_add_padding_at_start", "track numerator", msg.numerator,"track denominator", msg.denominator)
-                    track_numerator = msg.numerator
-                    track_denominator = msg.denominator
-                    break
-                index+=1
-            print("padding insert position (index of midi msg):", first_time_signature_index+1)
-            # must use 4 instead of track_denominator. due to midi weirdness
-            ticks_per_measure = int (numerator * mid.ticks_per_beat * 4 / denominator)
-            total_ticks = num_measures * ticks_per_measure
-
-            padding_note = mido.Message("note_off", time = total_ticks)
-            #time_sig_msg = mido.MetaMessage('time_signature',numerator=track_numerator, denominator=track_denominator,time=0)
-            #track.insert(0, time_sig_msg)
-            track.insert(first_time_signature_index+1, padding_note)
+        _add_padding_at_start(mid, num_measures, numerator, denominator)
         adjusted_midi_file = f"{os.path.splitext(midi_file)[0]}_padded.mid"
         mid.save(adjusted_midi_file)
         return adjusted_midi_file
 
+def _add_simple_drum(mid, perc_inst):
+    #Tempo is in microseconds per beat (quarter note) default: 500000  (60 bpm)
+
+    # add a new perc track
+    new_track = mido.MidiTrack()
+    perc_channel = 15
+    # set percussion inst
+    new_track.append(mido.MetaMessage("track_name",name="Percussion", time=0))
+    new_track.append(mido.Message('program_change', program=insts[perc_inst], channel= perc_channel, time=0))
+    # set volume
+    new_track.append(mido.Message("control_change",channel= perc_channel, control=7,value=90, time=0))
+
+    # collect time changes
+    time_changes = []
+    current_tick = 0
+    # default
+    last_numerator, last_denominator = 4, 4
+    for msg in mid.tracks[0]:
+        current_tick += msg.time
+        if msg.type == 'time_signature':
+            last_numerator, last_denominator = msg.numerator, msg.denominator
+            time_changes.append((msg.numerator,msg.denominator,current_tick))
+    # mark the ending
+    time_changes.append((last_numerator, last_denominator,current_tick))
+    print("TIME cHANGES", time_changes)
+    # add the percussion
+    for i in range(len(time_changes)-1):
+        numerator, denominator, current_tick = time_changes[i]
+        _, _, next_tick = time_changes[i+1]
+        #ticks_per_measure = numerator * mid.ticks_per_beat * 4 // denominator
+        ticks_per_note = mid.ticks_per_beat * 4 // denominator
+        if numerator == 3 or numerator == 6:
+            strong_beat_interval = 3
+        elif numerator == 2 or numerator == 4:
+            strong_beat_interval = 2
+        else:
+            strong_beat_interval = denominator
+        # add percussion at each beat, strong beats louder
+        # note duration: a beat
+        # time is the delay from current time
+        strong_on = mido.Message("note_on", note=60, velocity=90, time = 0, channel=perc_channel)
+        weak_on = strong_on.copy(velocity=64)
+        note_off = mido.Message("note_off", note=60, velocity=64, time = ticks_per_note, channel=perc_channel)
+        num_beats = len(range(current_tick, next_tick, ticks_per_note))
+        new_track.extend(msg.copy() for note_count in range(num_beats)
+                         for msg in ((weak_on if note_count%strong_beat_interval else strong_on), note_off))
+    # saved like a fresh mido.MidiFile() holding the tracks: type 1 (a type 0 file can only hold one track)
+    # at mido's default ticks per beat, the source resolution is not carried over
+    mid.type = 1
+    mid.ticks_per_beat = mido.midifiles.midifiles.DEFAULT_TICKS_PER_BEAT
+    mid.tracks.append(new_track)
+    return mid
+
 def midi_add_simple_drum(midi_file, perc_inst = "woodblock"):
     """
     add an additional percussion track
     """
     with mido.MidiFile(midi_file) as mid:
-        #Tempo is in microseconds per beat (quarter note) default: 500000  (60 bpm)
-
-        new_mid = mido.MidiFile()
-        # copy everything
-        for track in mid.tracks:
-            new_track = mido.MidiTrack()
-            new_mid.tracks.append(new_track)
-
-            for msg in track:
-                new_track.append(msg)
-
-        # add a new perc track
-        new_track = mido.MidiTrack()
-        perc_channel = 15
-        # set percussion inst
-        new_track.append(mido.MetaMessage("track_name",name="Percussion", time=0))
-        new_track.append(mido.Message('program_change', program=insts[perc_inst], channel= perc_channel, time=0))
-        # set volume
-        new_track.append(mido.Message("control_change",channel= perc_channel, control=7,value=90, time=0))
-
-        # collect time changes
-        time_changes = []
-        current_tick = 0
-        # default
-        last_numerator, last_denominator = 4, 4
-        for msg in mid.tracks[0]:
-            current_tick += msg.time
-            if msg.type == 'time_signature':
-                last_numerator, last_denominator = msg.numerator, msg.denominator
-                time_changes.append((msg.numerator,msg.denominator,current_tick))
-        # mark the ending
-        time_changes.append((last_numerator, last_denominator,current_tick))
-        print("TIME cHANGES", time_changes)
-        # add the percussion
-        for i in range(len(time_changes)-1):
-            numerator, denominator, current_tick = time_changes[i]
-            _, _, next_tick = time_changes[i+1]
-            #ticks_per_measure = numerator * mid.ticks_per_beat * 4 // denominator
-            ticks_per_note = mid.ticks_per_beat * 4 // denominator
-            if numerator == 3 or numerator == 6:
-                strong_beat_interval = 3
-            elif numerator == 2 or numerator == 4:
-                strong_beat_interval = 2
-            else:
-                strong_beat_interval = denominator
-            note_count = 0
-            # add percussion at each beat
-            for time in range(current_tick, next_tick, ticks_per_note):
-                #print(time)
-                if note_count%strong_beat_interval==0:
-                    note_on_vel = 90
-                else:
-                    note_on_vel = 64
-                # note duration: a beat
-                # time is the delay from current time
-                note_on = mido.Message("note_on", note=60, velocity=note_on_vel, time = 0, channel=perc_channel)
-                new_track.append(note_on)
-                note_off = mido.Message("note_off", note=60, velocity=64, time = ticks_per_note, channel=perc_channel)
-                new_track.append(note_off)
-                note_count+=1
-        new_mid.tracks.append(new_track)
-
+        _add_simple_drum(mid, perc_inst)
         adjusted_midi_file = f"{os.path.splitext(midi_file)[0]}_drum_added.mid"
-        new_mid.save(adjusted_midi_file)
+        mid.save(adjusted_midi_file)
         return adjusted_midi_file
 
-def midi_to_mp3(adjusted_midi_file, mp3_file):
+def build_adjusted_midi(midi_file, bpm = 100, inst = "nylon-guitar", perc_inst = "woodblock", num_measures_padded = 6, numerator_padded = 4, denominator_padded = 4, change_inst = True, add_drum = True, change_tempo = True):
+    """
+    load the midi once and apply padding, tempo, instrument and drum in memory
+    returns the adjusted MidiFile and the file name the separate steps would have saved it under
+    """
+    print(f"ADD PADDING: {midi_file}, num padded measures {num_measures_padded} numerator {numerator_padded} denominator {denominator_padded}")
+    adjusted_midi_file = f"{os.path.splitext(midi_file)[0]}_padded"
+    with mido.MidiFile(midi_file) as mid:
+        _add_padding_at_start(mid, num_measures_padded, numerator_padded, denominator_padded)
+        if change_tempo:
+            _adjust_tempo(mid, bpm)
+            adjusted_midi_file += f"_{bpm}"
+            _examine_midi(mid, f"{adjusted_midi_file}.mid")
+        if change_inst:
+            _adjust_inst(mid, inst)
+        if add_drum:
+            _add_simple_drum(mid, perc_inst)
+            adjusted_midi_file += "_drum_added"
+        return mid, f"{adjusted_midi_file}.mid"
+
+def midi_to_mp3(adjusted_midi_file, mp3_file, soundfont):
     # Ensure the directory including the file exists; create if it doesn't
     os.makedirs(os.path.dirname(mp3_file), exist_ok=True)
 
-    temp_wav = tempfile.NamedTemporaryFile(suffix='.wav', delete=True)
+    # fluidsynth writes the wav through its own handle, so only reserve a name, next to the mp3 (same filesystem)
+    fd, temp_wav = tempfile.mkstemp(suffix='.wav', dir=os.path.dirname(mp3_file))
+    os.close(fd)
+    try:
+        fluidsynth = FluidSynth(soundfont)
+        # render in wave
+        fluidsynth.midi_to_audio(adjusted_midi_file, temp_wav)
 
-    fluidsynth = FluidSynth(soundfont)
-    # render in wave
-    fluidsynth.midi_to_audio(adjusted_midi_file, temp_wav.name)
-
-    # convert to mp3
-    audio = AudioSegment.from_wav(temp_wav.name)
-    audio.export(mp3_file, format="mp3")
+        # convert to mp3
+        wav_to_mp3(temp_wav, mp3_file)
+    finally:
+        os.unlink(temp_wav)
 
 def generate_mp3(midi_file, bpm = 100, soundfont = None, inst = "nylon-guitar", perc_inst="woodblock", num_measures_padded = 6, numerator_padded=4, denominator_padded=4, change_inst=True, add_drum=True, change_tempo=True):
     """
@@ -274,19 +330,22 @@ def generate_mp3(midi_file, bpm = 100, soundfont = None, inst = "nylon-guitar",
     3. add a drum track
     4. render to mp3
     """
-    #adjusted_midi_file = midi_file
-    adjusted_midi_file = midi_add_padding_at_start(midi_file, num_measures = num_measures_padded, numerator = numerator_padded, denominator = denominator_padded)
-    if change_tempo:
-        adjusted_midi_file = midi_adjust_tempo(adjusted_midi_file, bpm=bpm)
-        examine_midi_msg(adjusted_midi_file)
-    if change_inst:
-        adjusted_midi_file =  midi_adjust_inst(adjusted_midi_file, soundfont = soundfont, inst = inst)
-    if add_drum:
-        adjusted_midi_file = midi_add_simple_drum(adjusted_midi_file, perc_inst = perc_inst)
+    mid, adjusted_midi_file = build_adjusted_midi(midi_file, bpm = bpm, inst = inst, perc_inst = perc_inst, num_measures_padded = num_measures_padded, numerator_padded = numerator_padded, denominator_padded = denominator_padded, change_inst = change_inst, add_drum = add_drum, change_tempo = change_tempo)
+    # fluidsynth renders from a path, so this is the only save
+    mid.save(adjusted_midi_file)
     generate_mp3_simple(adjusted_midi_file,soundfont)
     print("")
     #examine_midi_msg(adjusted_midi_file)
 
+def generate_mp3_batch(midi_files, max_workers = None, **kwargs):
+    """
+    run generate_mp3 on several midi files side by side, one process per file (fluidsynth and the mp3 encoding are cpu bound)
+    kwargs are passed to every generate_mp3 call
+    Note: call it under `if __name__ == "__main__":`, worker processes re-import the calling script on macOS/windows
+    """
+    with ProcessPoolExecutor(max_workers=max_workers) as ex:
+        list(ex.map(functools.partial(generate_mp3, **kwargs), midi_files))
+
 insts = {"e-piano1":4,
          "e-piano2":5,
          "harpsichord":6,
@@ -1,29 +1,95 @@
 from pydub import AudioSegment
 from utils import *
-import mido
+import numpy as np
+import functools
+from concurrent.futures import ThreadPoolExecutor
 
-def overlay_countdown(music, start_measure=None, bpm=None, count_from=None, offset_in_ms=0, midifile=None):
+def _samples(seg):
     """
-    add countdown starting from specified measure; it will count down to 1
-    offset_in_ms: adjusting the timing to make it sound more natural
+    samples of an AudioSegment as a (frames, channels) array, without a copy
+    """
+    return np.frombuffer(seg.raw_data, dtype=f"<i{seg.sample_width}").reshape(-1, seg.channels)
+
+@functools.lru_cache(maxsize=32)
+def _load_tts(i):
+    """
+    decoded countdown voice for number i, kept around for later countdowns
+    """
+    return load_mp3(f"./tts/{i}_trimmed.mp3")
+
+def overlay_many(music, placements):
+    """
+    overlay several voices at once, like chaining music.overlay(voice, position=position_ms)
+    the result is the same when the voices already have the music's format and no partial mix along the chain clips;
+    otherwise the formats are synced once up front and the sum is clipped only once at the end
+    placements: (position_ms, voice) pairs
     """
-    mid = mido.MidiFile(midifile)
+    placements = list(placements)
+    positions = [position_ms for position_ms, _ in placements]
+    voices = [voice for _, voice in placements]
+    # bring everything to a common format like AudioSegment.overlay does, then mix in one sample array
+    # instead of copying the whole music once per voice
+    segs = [music, *voices]
+    channels = max(seg.channels for seg in segs)
+    frame_rate = max(seg.frame_rate for seg in segs)
+    sample_width = max(seg.sample_width for seg in segs)
+    music, *voices = [seg.set_channels(channels).set_frame_rate(frame_rate).set_sample_width(sample_width) for seg in segs]
+    mix = _samples(music).astype(np.int64)
+    for overlay_position_ms, voice in zip(positions, voices):
+        # clamp in frames, len(music) is rounded up to whole ms and can point past the last frame
+        start = min(int(max(overlay_position_ms, 0) * frame_rate / 1000), len(mix))
+        samples = _samples(voice)[:len(mix)-start]
+        mix[start:start+len(samples)] += samples
+    dtype = np.dtype(f"<i{sample_width}")
+    np.clip(mix, np.iinfo(dtype).min, np.iinfo(dtype).max, out=mix)
+    return AudioSegment(data=mix.astype(dtype).tobytes(), sample_width=sample_width, frame_rate=frame_rate, channels=channels)
 
-    initial_overlay_position_ms = get_measure_starts(mid)[start_measure][1]*1000
+def countdown_placements(start_measure=None, bpm=None, count_from=None, offset_in_ms=0, midifile=None):
+    """
+    (position_ms, voice) pairs of a countdown starting from specified measure; it will count down to 1
+    offset_in_ms: adjusting the timing to make it sound more natural
+    """
+    initial_overlay_position_ms = get_file_measure_starts(midifile)[start_measure][1]*1000
     interval = 60000/bpm
-    for i in range(count_from, 0, -1):
+    numbers = range(count_from, 0, -1)
+    positions = []
+    for i in numbers:
         overlay_position_ms = initial_overlay_position_ms + interval*(count_from-i)+offset_in_ms
         print(f"overlay {i} at:",overlay_position_ms/1000)
-        voice = AudioSegment.from_mp3(f"./tts/{i}_trimmed.mp3")
-        music = music.overlay(voice, position=overlay_position_ms)
-    return music
+        positions.append(overlay_position_ms)
+    # each mp3 decode waits on its own ffmpeg process, so run them side by side
+    with ThreadPoolExecutor(max_workers=max(1, len(numbers))) as pool:
+        voices = list(pool.map(_load_tts, numbers))
+    return list(zip(positions, voices))
+
+def overlay_countdown(music, start_measure=None, bpm=None, count_from=None, offset_in_ms=0, midifile=None):
+    """
+    add countdown starting from specified measure; it will count down to 1
+    offset_in_ms: adjusting the timing to make it sound more natural
+    """
+    return overlay_many(music, countdown_placements(start_measure=start_measure, bpm=bpm, count_from=count_from, offset_in_ms=offset_in_ms, midifile=midifile))
 
 def overlay_at_measure(music, voice, measure_number=None,midifile=None,offset_in_ms=0):
     """
     overlay voice instruction from specific measure
     offset_in_ms: adjusting the timing to make it sound more natural
     """
-    mid = mido.MidiFile(midifile)
-    overlay_position_ms = get_measure_starts(mid)[measure_number][1]*1000+offset_in_ms
+    overlay_position_ms = get_file_measure_starts(midifile)[measure_number][1]*1000+offset_in_ms
     music = music.overlay(voice, position=overlay_position_ms)
-    return music
\ No newline at end of file
+    return music
+
+def measure_placements(voices, measure_numbers=[], midifile=None, offset_in_ms=0):
+    """
+    (position_ms, voice) pairs placing one voice at the start of each measure number
+    offset_in_ms: adjusting the timing to make it sound more natural
+    """
+    measure_starts = get_file_measure_starts(midifile)
+    return [(measure_starts[measure_number][1]*1000+offset_in_ms, voice) for measure_number, voice in zip(measure_numbers, voices)]
+
+def overlay_at_measures(music, voices, measure_numbers=[], midifile=None, offset_in_ms=0):
+    """
+    overlay voice instructions from several measures in one mix
+    voices: one voice per measure number
+    offset_in_ms: adjusting the timing to make it sound more natural
+    """
+    return overlay_many(music, measure_placements(voices, measure_numbers=measure_numbers, midifile=midifile, offset_in_ms=offset_in_ms))
@@ -1,43 +1,62 @@
-from pydub import AudioSegment
 from utils import *
-import mido
 from overlay import *
-from moviepy.editor import *
-from tts import *
 from midi_rendition import *
+from concurrent.futures import ThreadPoolExecutor
+import ffmpeg
+import itertools
+import tempfile
+
+def bpm_at_measure(measure):
+    """
+    the tempo at the start of a measure, rounded to whole bpm
+    """
+    return int(round(60*1000000.0/measure_starts[measure][2]))
 
 def annotate_measure_info(text, starting_measure, ending_measure, measures_info = dict()):
     """
     annotate measure info for each measure [starting_measure, ending_measure] (inclusive)
     """
+    print(starting_measure, ending_measure)
     for measure in range(starting_measure,ending_measure+1):
-        print(starting_measure, ending_measure)
         if measure  < total_measures_count:
             ending_time = measure_starts[measure+1][1]
         else:
             ending_time = total_audio_duration
         measures_info[measure] = {"text":text,"starting_time":measure_starts[measure][1],"ending_time":ending_time}
 
-def overlay_instruction(music, text=None, measure_numbers=[],offset_in_ms=0, instruction_duration_in_measures = 1, measures_info = dict(), rhythmic=False, bpm=None):
+# decoded tts voices by filename, the same instruction text is overlaid from several measure lists
+_tts_cache = dict()
+
+def instruction_placements(text=None, measure_numbers=[],offset_in_ms=0, instruction_duration_in_measures = 1, measures_info = dict(), rhythmic=False):
     """
-    overlay tts instruction at selected measures
+    (position_ms, voice) pairs of a tts instruction at selected measures, and record their time info
     """
+    voices = []
     for measure_number in measure_numbers:
         if rhythmic:
-            bpm = int(round(60*1000000.0/measure_starts[measure_number][2]))
+            bpm = bpm_at_measure(measure_number)
             tts_filename = f"./tts/{text}_rhythmic_{bpm}.mp3"
             if not os.path.exists(tts_filename):
+                from tts import synth_rhythmic_speech
                 synth_rhythmic_speech(" ".join(text.split("_")), bpm = bpm)
         else:
             tts_filename = f"./tts/{text}.mp3"
             if not os.path.exists(tts_filename):
+                from tts import synth_sentence
                 synth_sentence(" ".join(text.split("_")))
-        voice = AudioSegment.from_mp3(tts_filename)
-        music = overlay_at_measure(music,voice,measure_number=measure_number, midifile = midifile, offset_in_ms=offset_in_ms)
+        if tts_filename not in _tts_cache:
+            _tts_cache[tts_filename] = load_mp3(tts_filename)
+        voices.append(_tts_cache[tts_filename])
     # record the time info
     for starting_measure in measure_numbers:
         annotate_measure_info(text, starting_measure, starting_measure+instruction_duration_in_measures-1, measures_info=measures_info)
-    return music
+    return measure_placements(voices, measure_numbers=measure_numbers, midifile = midifile, offset_in_ms=offset_in_ms)
+
+def overlay_instruction(music, text=None, measure_numbers=[],offset_in_ms=0, instruction_duration_in_measures = 1, measures_info = dict(), rhythmic=False, bpm=None):
+    """
+    overlay tts instruction at selected measures
+    """
+    return overlay_many(music, instruction_placements(text=text, measure_numbers=measure_numbers, offset_in_ms=offset_in_ms, instruction_duration_in_measures=instruction_duration_in_measures, measures_info=measures_info, rhythmic=rhythmic))
 
 def video_from_measures_info(measures_info, videofile = None, audiofile = None):
     """
@@ -45,61 +64,99 @@ def video_from_measures_info(measures_info, videofile = None, audiofile = None):
     audiofile: path of the audiofile
     """
     print("MAKING VIDEO")
-    text_duration = 0.0
-    previous_text = measures_info[1]["text"]
-    text_starting_time = measures_info[1]["starting_time"]
+    # moviepy is slow to import, only pull it in for the video
+    from moviepy.editor import TextClip
     texts = []
-
-    for measure in sorted(measures_info.keys()):
-        measure_info = measures_info[measure]
-        #print(measure, measure_info)
-        text = measure_info["text"]
-        if text==previous_text:
-            text_ending_time = measure_info["ending_time"]
-        else:
-            texts.append((previous_text, text_starting_time, text_ending_time))
-            text_starting_time = measure_info["starting_time"]
-            text_ending_time = measure_info["ending_time"]
-        previous_text = text
-    texts.append((previous_text, text_starting_time, text_ending_time))
+    # one slide per run of consecutive measures with the same text
+    for text, run in itertools.groupby((measures_info[measure] for measure in sorted(measures_info)), key=lambda measure_info: measure_info["text"]):
+        run = list(run)
+        texts.append((text, run[0]["starting_time"], run[-1]["ending_time"]))
     print(texts)
 
     text_size = (1200, 300)
-    clips = []
-    for text,text_starting_time, text_ending_time in texts:
-        text = " ".join(text.split("_"))
-        # Define the duration for each slide
-        duration = text_ending_time-text_starting_time  # seconds
-        # Create a clip with the text "walking"
-        clip = TextClip(text, fontsize=70, color='white', size=text_size, method='caption').set_duration(duration).set_pos('center').on_color(color=(0, 0, 0), col_opacity=1)
-        clips.append(clip)
-
-    # Concatenate the two clips
-    final_clip = concatenate_videoclips(clips)
-    # Load the audio file
-    audio = AudioFileClip(audiofile).subclip(0, final_clip.duration)
-    # Set the audio to the video clip
-    final_clip = final_clip.set_audio(audio)
-    # Write the result to a file
-    final_clip.write_videofile(videofile, fps=24, codec="h264", ffmpeg_params=["-pix_fmt", "yuv420p"])
+    # the slides are static: freeze each distinct text (ImageMagick) into a png once, then let ffmpeg's concat demuxer
+    # hold every png for its duration and encode it natively, instead of pumping every frame through moviepy
+    with tempfile.TemporaryDirectory() as tmpdir:
+        text_images = dict()
+        slides = []
+        for text,text_starting_time, text_ending_time in texts:
+            text = " ".join(text.split("_"))
+            # Define the duration for each slide
+            duration = text_ending_time-text_starting_time  # seconds
+            if text not in text_images:
+                text_images[text] = os.path.join(tmpdir, f"{len(text_images)}.png")
+                TextClip(text, fontsize=70, color='white', size=text_size, method='caption').set_duration(duration).set_pos('center').on_color(color=(0, 0, 0), col_opacity=1).save_frame(text_images[text])
+            slides.append(f"file '{text_images[text]}'\nduration {duration}\n")
+        # the concat demuxer drops the duration of the last entry unless the file is listed once more
+        slides.append(f"file '{text_images[text]}'\n")
+        slides_file = os.path.join(tmpdir, "slides.txt")
+        with open(slides_file, "w") as f:
+            f.writelines(slides)
+
+        total_duration = sum(end-start for _, start, end in texts)
+        video = ffmpeg.input(slides_file, format="concat", safe=0)
+        # the audio is cut to the slides and copied as is
+        audio = ffmpeg.input(audiofile)
+        (ffmpeg.output(video, audio, videofile, t=total_duration, r=24, vcodec="libx264", preset="ultrafast", tune="stillimage", g=240, pix_fmt="yuv420p", acodec="copy")
+            .overwrite_output()
+            .run())
+
+def prepare_tts(instructions, max_workers=8):
+    """
+    make sure every tts file the voiced instructions need exists and is decoded in _tts_cache, before any overlay
+    missing sentences are fetched concurrently (each is a blocking gTTS request), rhythmic ones afterwards one by one
+    since they write per-word files that other jobs may share; the decodes then run side by side (one ffmpeg each)
+    """
+    needed, sentences, rhythmic_jobs = set(), dict(), dict()
+    for info in instructions:
+        if not info["voiced"]:
+            continue
+        text = "_".join(info["text"].split())
+        if info.get("rhythmic",False):
+            for measure_number in info["measure_numbers"]:
+                bpm = bpm_at_measure(measure_number)
+                tts_filename = f"./tts/{text}_rhythmic_{bpm}.mp3"
+                needed.add(tts_filename)
+                if not os.path.exists(tts_filename):
+                    rhythmic_jobs[tts_filename] = (" ".join(text.split("_")), bpm)
+        else:
+            tts_filename = f"./tts/{text}.mp3"
+            needed.add(tts_filename)
+            if not os.path.exists(tts_filename):
+                sentences[tts_filename] = " ".join(text.split("_"))
+    if sentences or rhythmic_jobs:
+        # gtts is only needed when something has to be synthesized
+        from tts import synth_sentence, synth_rhythmic_speech
+        # network bound, so not capped by the core count
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            list(pool.map(synth_sentence, sentences.values()))
+        for text, bpm in rhythmic_jobs.values():
+            synth_rhythmic_speech(text, bpm = bpm)
+    to_decode = sorted(needed - _tts_cache.keys())
+    # each decode is a cpu bound ffmpeg process, at most one per core
+    with ThreadPoolExecutor(max_workers=min(max_workers, os.cpu_count() or 1)) as pool:
+        _tts_cache.update(zip(to_decode, pool.map(load_mp3, to_decode)))
 
 def overlay_from_yaml(yaml_path=None, music=None, midifile=None, measures_info=None):
-    stuff = load_yaml(yaml_path)
+    stuff = load_yaml_cached(yaml_path)
+    # collect every voice first and mix them into the music once at the end
+    placements = []
     for ctd in stuff["countdowns"]:
         # get the tempo at the measure
-        bpm = int(round(60*1000000.0/measure_starts[ctd["start_measure"]][2]))
-        music = overlay_countdown(music, midifile=midifile,start_measure=ctd["start_measure"],bpm=bpm/ctd.get("every_x_beat",1) ,count_from=ctd["count_from"],offset_in_ms=ctd.get("offset_in_ms",0))
+        bpm = bpm_at_measure(ctd["start_measure"])
+        placements += countdown_placements(midifile=midifile,start_measure=ctd["start_measure"],bpm=bpm/ctd.get("every_x_beat",1) ,count_from=ctd["count_from"],offset_in_ms=ctd.get("offset_in_ms",0))
     instructions = stuff["instructions"]
+    prepare_tts(instructions)
     for info in instructions:
         text = "_".join(info["text"].split())
         if info["voiced"]:
             instruction_duration_in_measures = info.get("instruction_duration_in_measures",1)
             rhythmic = info.get("rhythmic",False)
-            music = overlay_instruction(music, text=text, measure_numbers = info["measure_numbers"], instruction_duration_in_measures = instruction_duration_in_measures, measures_info=measures_info, rhythmic=rhythmic, bpm=bpm)
+            placements += instruction_placements(text=text, measure_numbers = info["measure_numbers"], instruction_duration_in_measures = instruction_duration_in_measures, measures_info=measures_info, rhythmic=rhythmic)
         else:
             for start_measure in info["measure_numbers"]:
                 annotate_measure_info(text,start_measure,start_measure+info["instruction_duration_in_measures"]-1,measures_info=measures_info)
-    return music
+    return overlay_many(music, placements)
 
 
 # Define paths and filenames
@@ -262,17 +319,18 @@ else:
     mp3file_overlay = f"./music/{original_name}_padded_drum_added_overlay.mp3"
     mp4file = f"{yaml_name}.mp4"
 
-total_audio_duration = get_duration(mp3file)#alternatively: mid.length the two might be different, due to reverb
-mid = mido.MidiFile(midifile)
-music = AudioSegment.from_mp3(mp3file)
-measure_starts = get_measure_starts(mid) # a dict, in ticks and seconds and tempo (microseconds)
+music = load_mp3(mp3file)
+# the decoded music already knows its length, no need for a separate ffprobe run
+total_audio_duration = music.duration_seconds#alternatively: mid.length the two might be different, due to reverb
+measure_starts = get_file_measure_starts(midifile) # a dict, in ticks and seconds and tempo (microseconds)
 total_measures_count = max(measure_starts.keys())
 print("total number of measures",total_measures_count,"total duration",total_audio_duration)
 measures_info = dict() #global
 
 music = overlay_from_yaml(yaml_path=f"./yaml/{yaml_name}.yaml", music=music, midifile=midifile, measures_info=measures_info)
 
-music.export(mp3file_overlay, format="mp3")
+export_mp3(music, mp3file_overlay)
 
-{print(f"{key}: {value}") for key, value in measures_info.items()}
+for key, value in measures_info.items():
+    print(f"{key}: {value}")
 video_from_measures_info(measures_info, videofile=mp4file, audiofile = mp3file_overlay)
\ No newline at end of file
@@ -2,7 +2,12 @@ from gtts import gTTS
 import os
 import ffmpeg
 from utils import *
+from overlay import overlay_many
 import sys
+import hashlib
+import io
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
 from pydub import AudioSegment
 
 def synth_sentence(text):
@@ -13,30 +18,97 @@ def synth_sentence(text):
     duration_seconds = get_duration(filename)
     print(f"the duration of: {filename}\nis {duration_seconds} seconds")
 
+TTS_CACHE_DIR = "./tts/.cache"
+
+def _write_cache_file(path, write):
+    """
+    write(tmp_path) to a temp file in TTS_CACHE_DIR, then rename it onto path,
+    so an interrupted write never leaves a truncated entry that looks like a cache hit
+    """
+    fd, tmp = tempfile.mkstemp(suffix=".tmp", dir=TTS_CACHE_DIR)
+    os.close(fd)
+    try:
+        write(tmp)
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+def _cached_tts(word, lang='en', slow=False):
+    """
+    silence-trimmed utterance of a single word
+    both the gTTS mp3 and the trimmed audio are kept in TTS_CACHE_DIR (keyed by a hash of word, lang, slow),
+    so a word is only requested and trimmed once
+    """
+    key = hashlib.sha1(f"{word}|{lang}|{int(slow)}".encode()).hexdigest()
+    # trimmed copy as wav, so reuse does not add another lossy encode
+    trimmed_path = os.path.join(TTS_CACHE_DIR, f"{key}_trim.wav")
+    if os.path.exists(trimmed_path):
+        return AudioSegment.from_wav(trimmed_path)
+    os.makedirs(TTS_CACHE_DIR, exist_ok=True)
+    path = os.path.join(TTS_CACHE_DIR, f"{key}.mp3")
+    if os.path.exists(path):
+        audio = AudioSegment.from_mp3(path)
+    else:
+        # fetch into memory and decode from there, the mp3 is only written out for the cache
+        buf = io.BytesIO()
+        gTTS(text=word, lang=lang, slow=slow).write_to_fp(buf)
+        def write_mp3(tmp):
+            with open(tmp, "wb") as f:
+                f.write(buf.getvalue())
+        _write_cache_file(path, write_mp3)
+        buf.seek(0)
+        audio = AudioSegment.from_file(buf, format="mp3")
+    audio = trim_silence(audio)
+    _write_cache_file(trimmed_path, lambda tmp: audio.export(tmp, format="wav"))
+    return audio
+
+def _splice_beats(audios, beat_ms, duration_ms):
+    """
+    lay the words one per beat by copying their raw pcm into a silent buffer, no mixing
+    only for words that share one format and each fit within a beat, otherwise returns None
+    """
+    if not audios:
+        return None
+    frame_rate, channels, sample_width = audios[0].frame_rate, audios[0].channels, audios[0].sample_width
+    # 8 bit pcm is unsigned, zero bytes would not be silence
+    if sample_width < 2 or any((a.frame_rate, a.channels, a.sample_width) != (frame_rate, channels, sample_width) for a in audios):
+        return None
+    frame_width = channels * sample_width
+    starts = [int(beat_ms * i * frame_rate / 1000) for i in range(len(audios))]
+    ends = starts[1:] + [int(duration_ms * frame_rate / 1000)]
+    if any(len(a.raw_data) // frame_width > end - start for a, start, end in zip(audios, starts, ends)):
+        return None
+    data = bytearray(ends[-1] * frame_width)
+    for a, start in zip(audios, starts):
+        data[start*frame_width:start*frame_width+len(a.raw_data)] = a.raw_data
+    return AudioSegment(data=bytes(data), sample_width=sample_width, frame_rate=frame_rate, channels=channels)
+
 def synth_rhythmic_speech(text, bpm = 100):
     """
     create rhythmic utterance given the text containing more than one words
     """
     os.makedirs("./tts", exist_ok=True)
     words = text.split()
-    # generate individual sounds
-    audios = []
-    for word in words:
-        tts = gTTS(text=word, lang='en',slow=False)
-        tts.save(f"./tts/{word}.mp3")
-        audio = AudioSegment.from_mp3(f"./tts/{word}.mp3")
-        audio = trim_silence(audio)
-        audios.append(audio)
+    # generate individual sounds, the uncached words are requested concurrently (each is a blocking https round trip)
+    # repeated words are fetched once so no two threads write the same cache file
+    unique_words = list(dict.fromkeys(words))
+    with ThreadPoolExecutor(max_workers=min(8, len(unique_words)) or 1) as pool:
+        word_audios = dict(zip(unique_words, pool.map(_cached_tts, unique_words)))
+    audios = [word_audios[word] for word in words]
     num_of_beats = len(words)
     rhythmic_speech_duration = 60*1000.0/bpm*num_of_beats
-    # create empty sound
-    empty_audio = AudioSegment.silent(duration=rhythmic_speech_duration)
-    # overlay
-    for i, audio in enumerate(audios):
-        overlay_position_ms = 60*1000.0/bpm * i
-        empty_audio = empty_audio.overlay(audio, position=overlay_position_ms)
+    # words shorter than a beat never collide, so they can just be copied in place
+    empty_audio = _splice_beats(audios, 60*1000.0/bpm, rhythmic_speech_duration)
+    if empty_audio is None:
+        # create empty sound
+        empty_audio = AudioSegment.silent(duration=rhythmic_speech_duration)
+        # overlay, all words are mixed into one buffer instead of copying the whole track once per word
+        empty_audio = overlay_many(empty_audio, [(60*1000.0/bpm * i, audio) for i, audio in enumerate(audios)])
     underscored_name = "_".join(words)
-    empty_audio.export(f"./tts/{underscored_name}_rhythmic_{bpm}.mp3", format="mp3")
+    # speech cue only: gTTS is already 24 kHz mono, so encode it that way with a faster, lower quality vbr setting
+    empty_audio.export(f"./tts/{underscored_name}_rhythmic_{bpm}.mp3", format="mp3", codec="libmp3lame",
+                       parameters=["-q:a", "7", "-ac", "1", "-ar", "24000"])
 
 if __name__ == "__main__":
     """
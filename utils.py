@@ -1,13 +1,25 @@
 from pydub import AudioSegment
 import os
+import functools
 import ffmpeg
+from concurrent.futures import ThreadPoolExecutor
 import mido
+import numpy as np
 from pydub import AudioSegment
-from pydub.silence import detect_leading_silence
+from pydub.utils import ratio_to_db
 from bisect import bisect_right
 from dataclasses import dataclass, asdict
 import yaml
 import traceback
+import wave
+
+# ---- Optional mutagen (in-process mp3 duration) ----
+try:
+    from mutagen.mp3 import MP3, BitrateMode
+    HAS_MUTAGEN = True
+except Exception:
+    MP3 = BitrateMode = None
+    HAS_MUTAGEN = False
 
 def load_yaml(filepath):
     """
@@ -22,51 +34,159 @@ def load_yaml(filepath):
         traceback.print_exc()
         return dict()
 
+@functools.lru_cache(maxsize=16)
+def _load_yaml_cached(filepath, mtime):
+    return load_yaml(filepath)
+
+def load_yaml_cached(filepath):
+    """
+    load_yaml, parsed once per version of the file (path and modification time)
+    returns the shared dictionary, do not modify it
+    """
+    try:
+        mtime = os.path.getmtime(filepath)
+    except OSError:
+        return load_yaml(filepath)
+    return _load_yaml_cached(filepath, mtime)
+
+AUDIO_FORMATS = {"mp3", "wav", "ogg", "flac", "m4a"}
+
 def load_audio(filename):
     """
     load the audio file based on its extension
     """
-    file_name, file_extension = os.path.splitext(filename)
-
-    if file_extension.lower() == ".mp3":
-        audio = AudioSegment.from_mp3(filename)
-    elif file_extension.lower() == ".wav":
-        audio = AudioSegment.from_wav(filename)
-    elif file_extension.lower() == ".ogg":
-        audio = AudioSegment.from_ogg(filename)
-    else:
-        print(f"Unsupported file format: {file_extension}")
+    file_extension = os.path.splitext(filename)[1].lower().lstrip(".")
+    if file_extension not in AUDIO_FORMATS:
+        print(f"Unsupported file format: .{file_extension}")
         return
-    return audio
+    # AudioSegment.from_mp3/from_wav/from_ogg are just from_file with the format filled in
+    return AudioSegment.from_file(filename, format=file_extension)
+
+def load_mp3(filename, frame_rate=44100, channels=2):
+    """
+    decode an mp3 with a single ffmpeg call piping raw 16 bit pcm back, converted to frame_rate/channels
+    (AudioSegment.from_mp3 probes the file first and goes through a wav)
+    """
+    data, _ = ffmpeg.input(filename).output("pipe:", format="s16le", ar=frame_rate, ac=channels).run(capture_stdout=True, quiet=True)
+    return AudioSegment(data=data, sample_width=2, frame_rate=frame_rate, channels=channels)
+
+def export_mp3(audio, filename):
+    """
+    encode an AudioSegment to mp3 by piping its raw pcm to ffmpeg
+    """
+    (ffmpeg.input("pipe:", format=f"s{8*audio.sample_width}le", ar=audio.frame_rate, ac=audio.channels)
+        .output(filename, format="mp3", acodec="libmp3lame")
+        .overwrite_output()
+        .run(input=audio.raw_data, quiet=True))
 
 def get_duration(filename):
     """
     returns the duration of the audio in seconds
     """
     print(f"Getting duration for {filename}")
+    # read the header in process where possible, ffprobe is a subprocess per call
+    file_extension = os.path.splitext(filename)[1].lower()
+    if file_extension == ".wav":
+        try:
+            with wave.open(filename) as w:
+                return w.getnframes() / w.getframerate()
+        except wave.Error:
+            # e.g. float wavs, which the wave module cannot read
+            pass
+    elif file_extension == ".mp3" and HAS_MUTAGEN:
+        info = MP3(filename).info
+        # headerless cbr (what gTTS returns): both estimate from size and bitrate and agree.
+        # files with a Xing/Info header (e.g. ffmpeg's own exports) carry encoder delay/padding
+        # that ffprobe subtracts but mutagen does not always read, so those still go to ffprobe
+        if info.bitrate_mode == BitrateMode.UNKNOWN:
+            return float(info.length)
     duration_seconds = float(ffmpeg.probe(filename)['format']['duration'])
     return duration_seconds
 
+def _leading_silence_ms(samples, frame_rate, length_ms, silence_threshold, max_possible_amplitude, chunk_size=10):
+    """
+    same result as pydub's detect_leading_silence, on a (frames, channels) sample array:
+    the chunk rms values come from one cumulative sum instead of a slice and an AudioSegment per chunk
+    """
+    # smallest integer rms that pydub's dBFS does not count as silence
+    lo, hi = 1, int(max_possible_amplitude)+1
+    while lo < hi:
+        mid = (lo+hi)//2
+        if ratio_to_db(mid / max_possible_amplitude) < silence_threshold:
+            lo = mid+1
+        else:
+            hi = mid
+    rms_threshold = lo
+
+    chunk_starts_ms = np.arange(0, length_ms, chunk_size)
+    # frame positions like AudioSegment slicing does; frames past the end count as padded silence
+    starts = (chunk_starts_ms * (frame_rate / 1000.0)).astype(np.int64)
+    ends = (np.minimum(chunk_starts_ms + chunk_size, length_ms) * (frame_rate / 1000.0)).astype(np.int64)
+    # int64 sums are exact for 8/16 bit; 32 bit squares overflow it, so use doubles like audioop.rms does
+    frame_squares = (samples.astype(np.int64 if samples.dtype.itemsize < 4 else np.float64)**2).sum(axis=1)
+    cumulative = np.concatenate(([0], np.cumsum(frame_squares)))
+    num_frames, channels = samples.shape
+    sums = cumulative[np.minimum(ends, num_frames)] - cumulative[np.minimum(starts, num_frames)]
+    counts = (ends - starts) * channels
+    rms = np.floor(np.sqrt(sums / np.maximum(counts, 1)))
+    loud = np.flatnonzero((counts > 0) & (rms >= rms_threshold))
+    trim_ms = chunk_starts_ms[loud[0]] if len(loud) else len(chunk_starts_ms) * chunk_size
+    return int(min(trim_ms, length_ms))
+
 def trim_silence(audio_segment,silence_threshold=-30.0):
-    trim_leading_silence = lambda x: x[detect_leading_silence(x,silence_threshold=silence_threshold) :]
-    trim_trailing_silence = lambda x: trim_leading_silence(x.reverse()).reverse()
-    strip_silence = lambda x: trim_trailing_silence(trim_leading_silence(x))
+    """
+    strip leading and trailing silence, same result as trimming the leading silence of the audio and of its reverse
+    the trailing side is scanned on a reversed view of the samples, without building reversed AudioSegments
+    """
+    samples = np.frombuffer(audio_segment.raw_data, dtype=f"<i{audio_segment.sample_width}").reshape(-1, audio_segment.channels)
+    leading_ms = _leading_silence_ms(samples, audio_segment.frame_rate, len(audio_segment), silence_threshold, audio_segment.max_possible_amplitude)
+    audio = audio_segment[leading_ms:]
 
-    stripped = strip_silence(audio_segment)
-    return stripped
+    samples = np.frombuffer(audio.raw_data, dtype=f"<i{audio.sample_width}").reshape(-1, audio.channels)
+    length_ms = len(audio)
+    trailing_ms = _leading_silence_ms(samples[::-1], audio.frame_rate, length_ms, silence_threshold, audio.max_possible_amplitude)
+    # keep what slicing the reversed audio at trailing_ms would, reversed back
+    # (pydub pads a reversed slice that runs past the end with silence, which lands at the start here)
+    num_frames = len(samples)
+    start = int(trailing_ms * (audio.frame_rate / 1000.0))
+    end = int(length_ms * (audio.frame_rate / 1000.0))
+    kept = samples[max(num_frames-end, 0):max(num_frames-start, 0)]
+    padding = np.zeros((max(end-num_frames, 0), audio.channels), dtype=samples.dtype) if num_frames > start and end > num_frames else samples[:0]
+    return audio._spawn(np.concatenate((padding, kept)).tobytes())
 
 def speedup_audio_file(filename, speedup_factor):
+    if speedup_factor <= 0:
+        raise ValueError(f"speedup factor must be positive, got {speedup_factor}")
     file_extension = os.path.splitext(filename)[1]
-    audio = load_audio(filename)
 
-    audio_speedup = audio.speedup(playback_speed=speedup_factor)
+    # time-stretch with ffmpeg's atempo in one run, no decode/re-encode through python
+    # a single atempo takes factors in [0.5, 2.0], chain them for anything outside
+    stream = ffmpeg.input(filename).audio
+    remaining_factor = speedup_factor
+    while remaining_factor > 2.0:
+        stream = stream.filter("atempo", 2.0)
+        remaining_factor /= 2.0
+    while remaining_factor < 0.5:
+        stream = stream.filter("atempo", 0.5)
+        remaining_factor /= 0.5
+    stream = stream.filter("atempo", remaining_factor)
 
     #save to the same place with new name
     export_filename = f"{os.path.splitext(filename)[0]}_{speedup_factor}{file_extension}"
-    audio_speedup.export(export_filename, format=file_extension.lower()[1:])
+    stream.output(export_filename).overwrite_output().run(quiet=True)
 
     print(f"{filename} sped up successfully.")
 
+def speedup_audio_files(filenames, speedup_factor, max_workers=None):
+    """
+    run speedup_audio_file on several files side by side
+    each file is stretched by its own ffmpeg process, so threads are enough to keep them running in parallel
+    """
+    filenames = list(filenames)
+    max_workers = max_workers or min(os.cpu_count() or 1, len(filenames)) or 1
+    with ThreadPoolExecutor(max_workers=max_workers) as ex:
+        list(ex.map(speedup_audio_file, filenames, [speedup_factor]*len(filenames)))
+
 def ticks_to_seconds(ticks, ticks_per_quarter_note, microseconds_per_quarter_note):
     """
     given the number of ticks and tempo, calculate the duration in seconds
@@ -133,6 +253,10 @@ def get_measure_starts(mid):
     time_signature_changes.append((last_numerator, last_denominator,current_tick,current_time_in_seconds))
 
     measure_starts_dict = dict()
+    # tempo changes as arrays, so the tempo at every measure start of a meter section is looked up at once
+    tempo_ticks = np.array([x[0] for x in tempo_changes])
+    tempo_microseconds = np.array([x[1] for x in tempo_changes])
+    tempo_seconds = np.array([x[2] for x in tempo_changes], dtype=float)
 
     measure_count = 0
     for i in range(len(time_signature_changes)-1):
@@ -142,13 +266,29 @@ def get_measure_starts(mid):
         #ticks_per_measure = numerator * mid.ticks_per_beat * 4 // denominator
         ticks_per_measure = int (numerator * mid.ticks_per_beat * 4 / denominator)
 
-        # for each measure
-        for measure_start_tick in range(current_tick, next_tick, ticks_per_measure):
+        # for each measure, same arithmetic as current_tick_temporal_info
+        measure_start_ticks = np.arange(current_tick, next_tick, ticks_per_measure)
+        index = np.searchsorted(tempo_ticks, measure_start_ticks, side="right") - 1
+        if (index < 0).any():
+            raise ValueError("measure starts before the first tempo change")
+        measure_start_seconds = tempo_seconds[index] + (measure_start_ticks - tempo_ticks[index]) / mid.ticks_per_beat * tempo_microseconds[index] / 1000000
+        for measure_start_tick, seconds, microseconds_per_beat in zip(measure_start_ticks.tolist(), measure_start_seconds.tolist(), tempo_microseconds[index].tolist()):
             measure_count+=1
-            measure_start_seconds, measure_start_microseconds_per_beat = current_tick_temporal_info(measure_start_tick, tempo_changes, ticks_per_quarter_note = mid.ticks_per_beat)
-            measure_starts_dict[measure_count] = (measure_start_tick,measure_start_seconds, measure_start_microseconds_per_beat)
+            measure_starts_dict[measure_count] = (measure_start_tick, seconds, microseconds_per_beat)
     return measure_starts_dict
 
+@functools.lru_cache(maxsize=None)
+def _measure_starts_cached(midifile, mtime):
+    return get_measure_starts(mido.MidiFile(midifile))
+
+def get_file_measure_starts(midifile):
+    """
+    get_measure_starts for a midi file path
+    the file is parsed once per version (path and modification time), repeat calls reuse the result
+    returns the shared dict, do not modify it
+    """
+    return _measure_starts_cached(midifile, os.path.getmtime(midifile))
+
 if __name__ == "__main__":
     """
     mid = mido.MidiFile("./midi/Yankee_doodle_Saloon_style_100.mid")
@@ -157,8 +297,8 @@ if __name__ == "__main__":
 
     # speed up
     speed_up_factor=1.5
+    speedup_audio_files([f"./tts/{i}.mp3" for i in range(1,5)],speed_up_factor)
     for i in range(1,5):
-        speedup_audio_file(f"./tts/{i}.mp3",speed_up_factor)
         audio = AudioSegment.from_mp3(f"./tts/{i}_{speed_up_factor}.mp3")
         audio = trim_silence(audio)
         audio.export(f"./tts/{i}_trimmed.mp3", format="mp3")